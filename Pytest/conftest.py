@@ -4,6 +4,7 @@ Pytest configuration and shared fixtures for Hololink Sensor Bridge verification
 
 import pytest
 import os
+import re
 import sys
 from pathlib import Path
 import json
@@ -130,12 +131,31 @@ def ci_cd_root():
     return Path(__file__).parent.parent
 
 
+def _xdist_worker_index() -> int:
+    """Index of this pytest-xdist worker ("gw3" -> 3), 0 when not running under xdist."""
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "gw0")
+    return int(worker[2:]) if worker[2:].isdigit() else 0
+
+
 @pytest.fixture(scope="session")
 def hololink_device_ip():
     """
     Hololink device IP address.
     Can be overridden via environment variable HOLOLINK_IP.
+    With a device pool in HOLOLINK_IPS (comma separated) each pytest-xdist
+    worker owns one device: run with `-n <number of devices> --dist=loadscope`.
     """
+    pool = [ip.strip() for ip in os.environ.get("HOLOLINK_IPS", "").split(",") if ip.strip()]
+    if pool:
+        index = _xdist_worker_index()
+        if index >= len(pool):
+            # Never share: two workers on one FPGA would program and test it at the same time
+            pytest.fail(
+                f"pytest-xdist worker {index} has no device: HOLOLINK_IPS lists {len(pool)} "
+                f"device(s), run with -n {len(pool)} or fewer",
+                pytrace=False,
+            )
+        return pool[index]
     return os.environ.get("HOLOLINK_IP", "192.168.0.2")
 
 
@@ -296,6 +316,11 @@ def run_report(save_dir, test_session_id, hololink_device_ip, device_type, bitst
         output_path = save_dir / f"test_results_{test_session_id}.json"
         report.write(save_dir, filename=output_path.name)
         print(f"\n✓ Structured JSON report: {output_path}")
+        try:
+            binary_path = report.write_binary(save_dir, filename=output_path.with_suffix(".msgpack").name)
+            print(f"✓ Binary report for ingestion: {binary_path}")
+        except ImportError:
+            pass  # msgspec not installed; ingestion reads the JSON report
     except Exception as e:
         print(f"\n✗ Failed to write structured report: {e}")
 
@@ -655,12 +680,94 @@ def docker_available():
         pytest.skip("Docker command not found")
 
 
+@pytest.fixture(scope="session", autouse=True)
+def _prune_stale_containers():
+    """Remove stopped containers left by earlier programming runs, in one daemon call."""
+    import subprocess
+    try:
+        subprocess.run(["docker", "container", "prune", "-f", "--filter", "label=bitstream-programmer"],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+    except FileNotFoundError:
+        pass
+
+
+@pytest.fixture(scope="session")
+def hololink_container(docker_available, workspace_root, ci_cd_root):
+    """
+    One long-lived hololink-demo container for the whole session.
+    Workloads run in it via `docker exec` instead of paying a `docker run` cold start each.
+    Yields the container ID.
+    """
+    import subprocess
+    sys.path.insert(0, str(ci_cd_root / "eth_program_bitstream"))
+    from eth_prog_docker_wrapper import docker_run_options, get_docker_version
+    
+    image = f"hololink-demo:{get_docker_version(workspace_root)}"
+    cmd = ["docker", "run", "-d",
+           *docker_run_options(workspace_root, container_name=f"hololink_pytest_session_{_xdist_worker_index()}"),
+           image, "sleep", "infinity"]
+    result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+    if result.returncode != 0:
+        pytest.skip(f"Could not start {image}: {result.stderr.strip()}")
+    
+    container_id = result.stdout.strip()
+    yield container_id
+    
+    # --rm in the run options removes it once stopped
+    subprocess.run(["docker", "stop", "-t", "1", container_id], capture_output=True, check=False)
+
+
+@pytest.fixture(scope="session")
+def run_in_container(hololink_container):
+    """
+    Helper to run a command in the session container.
+    Returns a function taking an argv list and returning the CompletedProcess.
+    """
+    import subprocess
+    
+    def _run(cmd: list, timeout: int = None) -> subprocess.CompletedProcess:
+        return subprocess.run(["docker", "exec", hololink_container, *cmd],
+                              capture_output=True, text=True, timeout=timeout, check=False)
+    
+    return _run
+
+
+@pytest.fixture(scope="session")
+def relay(add_scripts_to_path):
+    """
+    USB relay board opened once for the whole session.
+    Tests call control_relay_dll.relay_xon()/relay_xoff() directly; the
+    init/enumerate/open cost of RelayController is paid only here.
+    """
+    import control_relay_dll
+    try:
+        if not control_relay_dll.initialize():
+            pytest.skip("USB relay device not found")
+    except (FileNotFoundError, OSError) as e:
+        pytest.skip(f"USB relay library not available: {e}")
+    yield control_relay_dll
+    control_relay_dll.cleanup()
+
+
 @pytest.fixture(scope="function")
 def max_saves():
     """Number of images to save during verification (default 1)."""
     return int(os.environ.get("MAX_SAVES", "1"))
 
 
+# Final status line printed by the bitstream programming wrapper, all eight fields in one pass
+_RESULT_KEYS = (
+    "docker_ok", "bitstream_ok", "fpga_ok", "manifest_ok",
+    "program_ok", "powercycle_ok", "ethspeed_ok", "camera_ok",
+)
+_RESULT_RE = re.compile(
+    r"Docker OK:\s*(\w+)[^\n]*?Bitstream OK:\s*(\w+)[^\n]*?FPGA OK:\s*(\w+)"
+    r"[^\n]*?Manifest OK:\s*(\w+)[^\n]*?Program Success:\s*(\w+)"
+    r"[^\n]*?Powercycle OK:\s*(\w+)[^\n]*?Ethspeed OK:\s*(\w+)[^\n]*?Camera OK:\s*(\w+)",
+    re.IGNORECASE,
+)
+
+
 @pytest.fixture(scope="function")
 def test_output_parser():
     """
@@ -689,23 +796,13 @@ def test_output_parser():
         # Look for success indicators in output
         combined = stdout + stderr
         
-        # Parse the final result line
-        if "Docker OK:" in combined:
-            parts = combined.split("Docker OK:")[-1].strip()
-            # Extract boolean values
-            try:
-                values = [s.split(":")[-1].strip() for s in parts.split(",")]
-                if len(values) >= 8:
-                    results["docker_ok"] = values[0].lower() == "true"
-                    results["bitstream_ok"] = values[1].lower() == "true"
-                    results["fpga_ok"] = values[2].lower() == "true"
-                    results["manifest_ok"] = values[3].lower() == "true"
-                    results["program_ok"] = values[4].lower() == "true"
-                    results["powercycle_ok"] = values[5].lower() == "true"
-                    results["ethspeed_ok"] = values[6].lower() == "true"
-                    results["camera_ok"] = values[7].lower() == "true"
-            except (IndexError, ValueError):
-                pass
+        # Parse the final result line (last one wins, as before)
+        match = None
+        for match in _RESULT_RE.finditer(combined):
+            pass
+        if match:
+            for key, value in zip(_RESULT_KEYS, match.groups()):
+                results[key] = value.lower() == "true"
         
         # Also check for specific success/failure messages
         if "✓ Bitstream programming completed successfully" in combined:
@@ -0,0 +1,95 @@
+"""
+Unit tests for scripts/generate_manifest_md5.py manifest writing.
+No hardware needed: checks that the built-in dump_manifest() writer reads
+back as the same manifest, and agrees with the --legacy-yaml (yaml.dump) path.
+"""
+
+import hashlib
+import io
+
+import pytest
+import yaml
+
+
+@pytest.fixture
+def manifest_module(add_scripts_to_path):
+    import generate_manifest_md5
+    return generate_manifest_md5
+
+
+# Keys YAML would resolve to int/float/bool/None, or that need quoting as plain scalars
+TRICKY_KEYS = ["2510", "1.0", "0x1F", "yes", "on", "No", "null", "~", "true", "-lead", "a: b", "#x", ""]
+
+
+def _sample_manifest():
+    return {
+        "hololink": {
+            "archive": {"version": "2510", "enrollment_date": "2026-01-26T13:05:17+00:00"},
+            "content": {
+                "fpga_cpnx_versa_0104_2507.bit": {"filename": "bitstream/fpga.bit", "md5": "0" * 32, "size": 123},
+                **{key: {"filename": f"{key}.bit", "md5": "1" * 32, "size": 0} for key in TRICKY_KEYS},
+            },
+            "fpga_uuid": ["889b7ce3-65a5-4247-8b05-4ff1904c3359", "yes", "42"],
+            "images": [{"content": key, "context": "cpnx"} for key in TRICKY_KEYS],
+            "licenses": ["NVIDIA_RTL_License_Agreement.txt"],
+            "strategy": "sensor_bridge_10",
+        }
+    }
+
+
+def _dump(manifest_module, manifest, legacy_yaml=False):
+    f = io.StringIO()
+    if legacy_yaml:
+        yaml.dump(manifest, f, Dumper=manifest_module.ManifestDumper, default_flow_style=False)
+    else:
+        manifest_module.dump_manifest(manifest, f)
+    return f.getvalue()
+
+
+@pytest.mark.quick
+def test_dump_manifest_round_trips(manifest_module):
+    """yaml.safe_load() of dump_manifest() output is the manifest that was written."""
+    manifest = _sample_manifest()
+
+    assert yaml.safe_load(_dump(manifest_module, manifest)) == manifest
+
+
+@pytest.mark.quick
+def test_dump_manifest_matches_legacy_yaml(manifest_module):
+    """dump_manifest() and yaml.dump() load back to the same manifest."""
+    manifest = _sample_manifest()
+
+    assert yaml.safe_load(_dump(manifest_module, manifest)) == yaml.safe_load(
+        _dump(manifest_module, manifest, legacy_yaml=True)
+    )
+
+
+@pytest.mark.quick
+def test_run_matches_legacy_yaml(manifest_module, tmp_path, monkeypatch):
+    """run() writes the same manifest with and without --legacy-yaml."""
+    monkeypatch.setattr(manifest_module, "DIGEST_CACHE", tmp_path / "md5_cache.json")
+    bitstream = tmp_path / "2510"
+    bitstream.write_bytes(b"\x5a" * 4096)
+    eula = tmp_path / "EULA.txt"
+    eula.write_text("license text\n")
+
+    loaded = []
+    for legacy_yaml in (False, True):
+        manifest = tmp_path / f"manifest_{legacy_yaml}.yaml"
+        manifest_module.run(
+            version="2510",
+            manifest=str(manifest),
+            cpnx_file=str(bitstream),
+            eula_file=str(eula),
+            fpga_uuid=["889b7ce3-65a5-4247-8b05-4ff1904c3359"],
+            md5=hashlib.md5(bitstream.read_bytes()).hexdigest(),
+            legacy_yaml=legacy_yaml,
+        )
+        data = yaml.safe_load(manifest.read_text())
+        data["hololink"]["archive"].pop("enrollment_date")
+        loaded.append(data)
+
+    assert loaded[0] == loaded[1]
+    hololink = loaded[0]["hololink"]
+    assert hololink["images"] == [{"content": "2510", "context": "cpnx"}]
+    assert "2510" in hololink["content"]
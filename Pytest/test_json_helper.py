@@ -0,0 +1,83 @@
+"""
+Unit tests for Reporting_JSON_SQL/json_helper.py report serialization.
+No hardware needed: checks that RunReport.write() produces valid JSON matching
+the report contents with every available encoder backend.
+"""
+
+import json
+from dataclasses import asdict
+
+import pytest
+
+import json_helper
+
+
+@pytest.fixture(params=["msgspec", "orjson", "json"])
+def encoder_backend(request, monkeypatch):
+    """Force json_helper onto one encoder backend (msgspec, orjson or plain json)."""
+    backend = request.param
+    if backend == "msgspec" and json_helper.msgspec is None:
+        pytest.skip("msgspec not installed")
+    if backend == "orjson" and json_helper.orjson is None:
+        pytest.skip("orjson not installed")
+
+    if backend != "msgspec":
+        monkeypatch.setattr(json_helper, "_ENCODER", None)
+    if backend == "json":
+        monkeypatch.setattr(json_helper, "orjson", None)
+    monkeypatch.setattr(json_helper, "_PLAIN_JSON", backend == "json")
+    return backend
+
+
+def _sample_report(with_tests=True):
+    report = json_helper.create_report(run_id="unit_test_run", env={"orin_image": "r36.3", "branch": None})
+    if with_tests:
+        report.add_test(
+            name="frame_gap_jitter",
+            test_id="TC_1.1",
+            status="pass",
+            duration_ms=12850.3,
+            metrics={"frame_gap_ms_mean": 16.67, "drops": 0, "nested": {"a": [1, 2]}},
+            artifacts=[json_helper.Artifact(type="PNG", path="frames/hist.png", label="Histogram")],
+            category="performance",
+            tags=["csi", "raw"],
+        )
+        report.add_test(
+            name="end_to_end_latency",
+            test_id="TC_1.2",
+            status="fail",
+            duration_ms=30123.5,
+            error_message='p99 exceeded "45 ms"\nthreshold',
+        )
+        report.add_timeseries(name="frame_gap_ms", path="metrics/frame_gap_ms.parquet", count=18000, meta={"unit": "ms"})
+    report.finalize()
+    return report
+
+
+@pytest.mark.quick
+@pytest.mark.parametrize("with_tests", [True, False])
+def test_write_round_trips(encoder_backend, with_tests, tmp_path):
+    """write() output parses as JSON and equals asdict() of the report."""
+    report = _sample_report(with_tests)
+    output_file = report.write(tmp_path)
+
+    assert json.loads(output_file.read_bytes()) == asdict(report)
+
+
+@pytest.mark.quick
+def test_write_encodes_numpy_metrics(encoder_backend, tmp_path):
+    """numpy scalars and arrays are written as plain JSON numbers and lists."""
+    np = pytest.importorskip("numpy")
+    report = json_helper.create_report(run_id="unit_test_numpy")
+    report.add_test(
+        name="numpy_metrics",
+        test_id="TC_1.3",
+        status="pass",
+        duration_ms=1.0,
+        metrics={"mean": np.float64(1.5), "drops": np.int64(3), "ok": np.bool_(True), "hist": np.arange(3)},
+    )
+    report.finalize()
+
+    metrics = json.loads(report.write(tmp_path).read_bytes())["tests"][0]["metrics"]
+    assert metrics == {"mean": 1.5, "drops": 3, "ok": True, "hist": [0, 1, 2]}
+    assert type(metrics["drops"]) is int
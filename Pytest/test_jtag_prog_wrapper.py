@@ -0,0 +1,57 @@
+"""
+Unit tests for jtag_program_bitstream/jtag_prog_wrapper.py bitstream caching.
+No hardware needed: checks that a cache hit skips radiant_usb_programmer.py but
+still leaves ../results/temp.txt pointing at a results directory for main().
+"""
+
+import os
+import subprocess
+
+import pytest
+
+
+@pytest.fixture
+def jtag_module(ci_cd_root, monkeypatch):
+    pytest.importorskip("kasa")
+    pytest.importorskip("PIL")
+    monkeypatch.syspath_prepend(str(ci_cd_root / "jtag_program_bitstream"))
+    import jtag_prog_wrapper
+    return jtag_prog_wrapper
+
+
+@pytest.fixture
+def wrapper(jtag_module):
+    wrapper = jtag_module.JTAGProgrammerWrapper()
+    yield wrapper
+    wrapper.close_orin_sessions()
+
+
+@pytest.mark.quick
+def test_cache_hit_writes_results_dir(jtag_module, wrapper, tmp_path, monkeypatch):
+    """A cache hit returns a results directory and records it in ../results/temp.txt."""
+    monkeypatch.setattr(jtag_module, "BITSTREAM_CACHE", tmp_path / "last_bitstream.json")
+    bitstream = tmp_path / "fpga.bit"
+    bitstream.write_bytes(b"\x5a" * jtag_module.MIN_BITSTREAM_BYTES)
+    jtag_module._save_bitstream_cache({
+        "cpnx": {
+            "digest": jtag_module._bitstream_digest(bitstream),
+            "operation": jtag_module.CACHEABLE_OPERATION,
+            "mtime": os.path.getmtime(bitstream),
+        }
+    })
+
+    work_dir = tmp_path / "jtag_program_bitstream"
+    work_dir.mkdir()
+    monkeypatch.chdir(work_dir)
+
+    def no_programmer(*args, **kwargs):
+        raise AssertionError("radiant_usb_programmer.py should not run on a cache hit")
+
+    monkeypatch.setattr(subprocess, "Popen", no_programmer)
+
+    success, results_dir = wrapper.program_fpga(str(bitstream), device_type="cpnx")
+
+    assert success
+    temp_file = tmp_path / "results" / "temp.txt"
+    assert temp_file.read_text() == results_dir
+    assert os.path.isdir(results_dir)
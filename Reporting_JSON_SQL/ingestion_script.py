@@ -5,20 +5,57 @@ Flexible ingestion script that handles:
 1. Direct JSON file path (structured_report.json)
 2. Directory path (searches for structured_report.json, test_results.json, or legacy format)
 """
-import json, sqlite3, pathlib
+import hashlib, html, json, re, sqlite3, pathlib
 from datetime import datetime, timezone
 from xml.etree import ElementTree as ET
 
+try:
+    import msgspec  # optional: needed only for binary .msgpack reports
+except ImportError:
+    msgspec = None
+
+# Statements are hoisted so sqlite3's statement cache reuses one prepared
+# statement per table instead of re-parsing SQL text on every row.
+_SQL_RUN = """INSERT OR REPLACE INTO runs(
+              run_id, timestamp, git_sha, branch, orin_image, fpga_bitstream,
+              dataset, operator_graph_version, notes, env, schema_version, source_dir,
+              content_sha)
+              VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?)"""
+_SQL_TEST = """INSERT INTO tests(
+               run_id, name, status, duration_ms, category, tags, error_message)
+               VALUES(?,?,?,?,?,?,?)"""
+_SQL_METRIC = """INSERT INTO metrics(
+                 run_id, test_id, name, value, unit, scope, meta)
+                 VALUES(?,?,?,?,?,?,?)"""
+_SQL_ARTIFACT = """INSERT INTO artifacts(
+                   run_id, test_id, type, path, label)
+                   VALUES(?,?,?,?,?)"""
+
+# pytest's junit.xml writes one flat <testcase classname= name= time=> per test,
+# which a byte-level regex scan can read far faster than building a DOM.
+_JUNIT_FAST_MAX_BYTES = 10 * 1024 * 1024
+_JUNIT_PYTEST_MARKER = b'<testsuite name="pytest"'
+_JUNIT_CASE = re.compile(
+    rb'<testcase\s+classname="([^"]*)"\s+name="([^"]*)"\s+time="([^"]*)"\s*'
+    rb'(?:/>|>(.*?)</testcase>)',
+    re.DOTALL)
+_JUNIT_FAILURE = re.compile(rb'<failure\b([^>]*)')
+_JUNIT_MESSAGE = re.compile(rb'\bmessage="([^"]*)"')
+
 def ensure_schema(conn):
+    # WAL lets the dashboard's read-only connections read while ingestion writes
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA mmap_size=268435456")
     conn.executescript("""
     CREATE TABLE IF NOT EXISTS runs (
       run_id TEXT PRIMARY KEY, timestamp TEXT, git_sha TEXT, branch TEXT,
       orin_image TEXT, fpga_bitstream TEXT, dataset TEXT, operator_graph_version TEXT, notes TEXT,
-      env TEXT, schema_version TEXT, source_dir TEXT
+      env TEXT, schema_version TEXT, source_dir TEXT, content_sha TEXT
     );
     CREATE TABLE IF NOT EXISTS tests (
       test_id INTEGER PRIMARY KEY AUTOINCREMENT, run_id TEXT, name TEXT,
-      status TEXT, duration_ms REAL, category TEXT, tags TEXT, error_message TEXT
+      status TEXT, duration_ms REAL NOT NULL DEFAULT 0, category TEXT, tags TEXT, error_message TEXT
     );
     CREATE TABLE IF NOT EXISTS metrics (
       metric_id INTEGER PRIMARY KEY AUTOINCREMENT, run_id TEXT, test_id INTEGER,
@@ -30,95 +67,105 @@ def ensure_schema(conn):
     );
     """)
     
-    # Migration: Add source_dir column if it doesn't exist (for existing databases)
-    try:
-        conn.execute("ALTER TABLE runs ADD COLUMN source_dir TEXT")
-        conn.commit()
-    except sqlite3.OperationalError:
-        # Column already exists
-        pass
-    
-    conn.commit()
+    # Migration: Add columns that older databases don't have yet
+    for column in ("source_dir", "content_sha"):
+        try:
+            conn.execute(f"ALTER TABLE runs ADD COLUMN {column} TEXT")
+        except sqlite3.OperationalError:
+            # Column already exists
+            pass
+
+    # Dashboard lists runs newest-first and looks up metric series by name/scope
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_timestamp ON runs(timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_metrics_name_scope ON metrics(name, scope)")
 
 def ingest_structured_report(json_path: pathlib.Path, conn):
-    """Ingest new structured_report.json format"""
-    data = json.loads(json_path.read_text())
+    """Ingest new structured_report.json format (or its binary .msgpack twin)"""
+    raw = json_path.read_bytes()
+    content_sha = hashlib.blake2b(raw, digest_size=16).hexdigest()
+    if json_path.suffix == ".msgpack":
+        data = msgspec.msgpack.decode(raw)
+    else:
+        data = json.loads(raw)
     
     run_id = data.get("run_id", json_path.stem)
+    row = conn.execute("SELECT content_sha FROM runs WHERE run_id=?", (run_id,)).fetchone()
+    if row is not None and row[0] == content_sha:
+        print(f"✓ unchanged: {run_id} (already ingested)")
+        return
     timestamp = data.get("timestamp", datetime.now(timezone.utc).isoformat())
     env = data.get("env", {})
     source_dir = str(json_path.parent.resolve())
     
-    # Insert run metadata
-    conn.execute("""INSERT OR REPLACE INTO runs(
-                    run_id, timestamp, git_sha, branch, orin_image, fpga_bitstream,
-                    dataset, operator_graph_version, notes, env, schema_version, source_dir)
-                    VALUES(?,?,?,?,?,?,?,?,?,?,?,?)""",
-                 (run_id, timestamp,
-                  env.get("git_sha"), env.get("branch"),
-                  env.get("host_platform"), env.get("bitstream_version"),
-                  None, env.get("operator_graph_version"),
-                  data.get("notes"),
-                  json.dumps(env),
-                  data.get("schema_version"),
-                  source_dir))
-    
-    # Insert tests
-    for test in data.get("tests", []):
-        cursor = conn.execute("""INSERT INTO tests(
-                                 run_id, name, status, duration_ms, category, tags, error_message)
-                                 VALUES(?,?,?,?,?,?,?)""",
-                             (run_id,
-                              test.get("name"),
-                              test.get("status"),
-                              test.get("duration_ms", 0.0),
-                              test.get("category"),
-                              json.dumps(test.get("tags", [])),
-                              test.get("error_message")))
-        
-        test_id = cursor.lastrowid
-        
-        # Insert test-level metrics
-        for metric_name, metric_value in test.get("metrics", {}).items():
-            if isinstance(metric_value, dict):
-                conn.execute("""INSERT INTO metrics(
-                                run_id, test_id, name, value, unit, scope, meta)
-                                VALUES(?,?,?,?,?,?,?)""",
-                           (run_id, test_id, metric_name,
-                            metric_value.get("value"), metric_value.get("unit"),
-                            "test", json.dumps(metric_value)))
-            elif isinstance(metric_value, (list, tuple)):
-                # Store list/array as JSON in meta, use first value or None for value column
-                first_val = metric_value[0] if metric_value else None
-                # If first_val is a dict or list, serialize it (SQLite can't bind complex types)
-                if isinstance(first_val, (dict, list)):
-                    first_val = json.dumps(first_val)
-                conn.execute("""INSERT INTO metrics(
-                                run_id, test_id, name, value, unit, scope, meta)
-                                VALUES(?,?,?,?,?,?,?)""",
-                           (run_id, test_id, metric_name, first_val,
-                            None, "test", json.dumps({"array": metric_value})))
-            else:
-                # Simple scalar value
-                conn.execute("""INSERT INTO metrics(
-                                run_id, test_id, name, value, unit, scope, meta)
-                                VALUES(?,?,?,?,?,?,?)""",
-                           (run_id, test_id, metric_name, metric_value,
-                            None, "test", None))
-        
-        # Insert artifacts
-        for artifact in test.get("artifacts", []):
-            conn.execute("""INSERT INTO artifacts(
-                            run_id, test_id, type, path, label)
-                            VALUES(?,?,?,?,?)""",
-                       (run_id, test_id,
-                        artifact.get("type"),
-                        artifact.get("path"),
-                        artifact.get("label")))
-    
-    conn.commit()
+    conn.execute("BEGIN")
+    try:
+        # Drop rows from a previous ingest of this run so tests aren't duplicated
+        _delete_run_rows(conn, run_id)
+
+        # Insert run metadata
+        conn.execute(_SQL_RUN,
+                     (run_id, timestamp,
+                      env.get("git_sha"), env.get("branch"),
+                      env.get("host_platform"), env.get("bitstream_version"),
+                      None, env.get("operator_graph_version"),
+                      data.get("notes"),
+                      json.dumps(env),
+                      data.get("schema_version"),
+                      source_dir, content_sha))
+
+        # Insert tests
+        for test in data.get("tests", []):
+            cursor = conn.execute(_SQL_TEST,
+                                  (run_id,
+                                   test.get("name"),
+                                   test.get("status"),
+                                   test.get("duration_ms") or 0.0,
+                                   test.get("category"),
+                                   json.dumps(test.get("tags", [])),
+                                   test.get("error_message")))
+
+            test_id = cursor.lastrowid
+
+            # Insert test-level metrics
+            conn.executemany(_SQL_METRIC, (_metric_row(run_id, test_id, name, value)
+                                           for name, value in test.get("metrics", {}).items()))
+
+            # Insert artifacts
+            conn.executemany(_SQL_ARTIFACT, ((run_id, test_id,
+                                              artifact.get("type"),
+                                              artifact.get("path"),
+                                              artifact.get("label"))
+                                             for artifact in test.get("artifacts", [])))
+
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
     print(f"✓ Ingested structured report: {run_id} ({len(data.get('tests', []))} tests)")
 
+def _delete_run_rows(conn, run_id):
+    """Remove the tests/metrics/artifacts rows belonging to a run"""
+    for table in ("artifacts", "metrics", "tests"):
+        conn.execute(f"DELETE FROM {table} WHERE run_id=?", (run_id,))
+
+def _metric_row(run_id, test_id, metric_name, metric_value):
+    """Build the metrics-table row for one test-level metric value"""
+    if isinstance(metric_value, dict):
+        return (run_id, test_id, metric_name,
+                metric_value.get("value"), metric_value.get("unit"),
+                "test", json.dumps(metric_value))
+    if isinstance(metric_value, (list, tuple)):
+        # Store list/array as JSON in meta, use first value or None for value column
+        first_val = metric_value[0] if metric_value else None
+        # If first_val is a dict or list, serialize it (SQLite can't bind complex types)
+        if isinstance(first_val, (dict, list)):
+            first_val = json.dumps(first_val)
+        return (run_id, test_id, metric_name, first_val,
+                None, "test", json.dumps({"array": metric_value}))
+    # Simple scalar value
+    return (run_id, test_id, metric_name, metric_value, None, "test", None)
+
 def ingest_legacy_run(run_dir: pathlib.Path, conn):
     """Ingest legacy summary.json + junit.xml format"""
     run_id = run_dir.name
@@ -130,46 +177,96 @@ def ingest_legacy_run(run_dir: pathlib.Path, conn):
     if (run_dir / "summary.json").exists():
         summary = json.loads((run_dir / "summary.json").read_text())
 
-    conn.execute("""INSERT OR REPLACE INTO runs(
-                    run_id, timestamp, git_sha, branch, orin_image, fpga_bitstream,
-                    dataset, operator_graph_version, notes, env, schema_version, source_dir)
-                    VALUES(?,?,?,?,?,?,?,?,?,?,?,?)""",
-                 (run_id, meta["timestamp"],
-                  summary.get("git_sha"), summary.get("branch"),
-                  summary.get("orin_image"), summary.get("fpga_bitstream"),
-                  summary.get("dataset"), summary.get("operator_graph_version"),
-                  summary.get("notes"), None, "legacy", source_dir))
-    
-    # Parse JUnit
-    junit = run_dir / "junit.xml"
-    if junit.exists():
-        tree = ET.parse(junit)
-        for case in tree.findall(".//testcase"):
-            name = case.attrib.get("classname", "") + "::" + case.attrib.get("name", "")
-            duration = float(case.attrib.get("time", 0.0)) * 1000
-            failure = case.find("failure")
-            status = "fail" if failure is not None else "pass"
-            err = failure.attrib.get("message", "") if failure is not None else None
-            conn.execute("""INSERT INTO tests(
-                            run_id, name, status, duration_ms, category, tags, error_message)
-                            VALUES(?,?,?,?,?,?,?)""",
-                         (run_id, name, status, duration, None, None, err))
-    
-    # Store run-level metrics
-    for k, v in summary.get("metrics", {}).items():
-        conn.execute("""INSERT INTO metrics(
-                        run_id, test_id, name, value, unit, scope, meta)
-                        VALUES(?,?,?,?,?,?,?)""",
-                     (run_id, None, k, v["value"], v.get("unit"), "run",
-                      json.dumps(v.get("meta", {}))))
-    
-    conn.commit()
+    conn.execute("BEGIN")
+    try:
+        _delete_run_rows(conn, run_id)
+        conn.execute(_SQL_RUN,
+                     (run_id, meta["timestamp"],
+                      summary.get("git_sha"), summary.get("branch"),
+                      summary.get("orin_image"), summary.get("fpga_bitstream"),
+                      summary.get("dataset"), summary.get("operator_graph_version"),
+                      summary.get("notes"), None, "legacy", source_dir, None))
+
+        # Parse JUnit
+        junit = run_dir / "junit.xml"
+        if junit.exists():
+            conn.executemany(_SQL_TEST, _junit_rows(run_id, junit))
+
+        # Store run-level metrics
+        conn.executemany(_SQL_METRIC, ((run_id, None, k, v["value"], v.get("unit"), "run",
+                                        json.dumps(v.get("meta", {})))
+                                       for k, v in summary.get("metrics", {}).items()))
+
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
     print(f"✓ Ingested legacy run: {run_id}")
 
+def _junit_rows(run_id, junit: pathlib.Path):
+    """Return tests-table rows for every <testcase> in a JUnit XML file"""
+    data = junit.read_bytes()
+    if len(data) <= _JUNIT_FAST_MAX_BYTES and _JUNIT_PYTEST_MARKER in data[:512]:
+        rows = _junit_rows_fast(run_id, data)
+        if rows is not None:
+            return rows
+    return _junit_rows_xml(run_id, data)
+
+def _junit_rows_fast(run_id, data: bytes):
+    """Regex scan of a pytest junit.xml; None if any testcase did not match"""
+    rows = []
+    for case in _JUNIT_CASE.finditer(data):
+        classname, name, time_s, body = case.groups()
+        name = _xml_attr(classname) + "::" + _xml_attr(name)
+        duration = float(time_s or 0.0) * 1000
+        failure = _JUNIT_FAILURE.search(body) if body else None
+        status = "fail" if failure is not None else "pass"
+        err = None
+        if failure is not None:
+            message = _JUNIT_MESSAGE.search(failure.group(1))
+            err = _xml_attr(message.group(1)) if message else ""
+        rows.append((run_id, name, status, duration, None, None, err))
+    # Unexpected attribute order/extra attributes: let the XML parser handle it
+    if len(rows) != data.count(b"<testcase"):
+        return None
+    return rows
+
+def _junit_rows_xml(run_id, data: bytes):
+    """Canonical ElementTree parse of a JUnit XML document"""
+    rows = []
+    for case in ET.fromstring(data).iter("testcase"):
+        name = case.attrib.get("classname", "") + "::" + case.attrib.get("name", "")
+        duration = float(case.attrib.get("time", 0.0)) * 1000
+        failure = case.find("failure")
+        status = "fail" if failure is not None else "pass"
+        err = failure.attrib.get("message", "") if failure is not None else None
+        rows.append((run_id, name, status, duration, None, None, err))
+    return rows
+
+def _xml_attr(raw: bytes) -> str:
+    """Decode a raw XML attribute value, resolving entity/character references"""
+    return html.unescape(raw.decode("utf-8"))
+
+def _find_reports(directory: pathlib.Path, pattern: str):
+    """
+    Structured reports matching pattern (without suffix), excluding the simple
+    variant. A .msgpack report replaces its .json twin when msgspec is available.
+    """
+    reports = {}
+    for f in directory.glob(pattern + ".json"):
+        if "simple" not in f.name:
+            reports[f.with_suffix("")] = f
+    if msgspec is not None:
+        for f in directory.glob(pattern + ".msgpack"):
+            reports[f.with_suffix("")] = f
+    return list(reports.values())
+
 def ingest_path(path_str: str, conn):
     """
     Flexible ingestion that handles:
     - Direct JSON file path (test_results.json or test_results_*.json)
+    - Direct binary report path (test_results_*.msgpack, requires msgspec)
     - Directory path (searches for test_results.json first, then legacy format)
     """
     path = pathlib.Path(path_str)
@@ -189,23 +286,33 @@ def ingest_path(path_str: str, conn):
             print(f"⚠ Unknown JSON format: {path.name}")
         return
     
+    # Case 1b: Direct binary report
+    if path.is_file() and path.suffix == ".msgpack":
+        if msgspec is None:
+            print(f"✗ msgspec is required to ingest {path.name} (pip install msgspec)")
+        elif "test_results" in path.name:
+            ingest_structured_report(path, conn)
+        else:
+            print(f"⚠ Unknown binary format: {path.name}")
+        return
+    
     # Case 2: Directory - search for JSON files
     if path.is_dir():
-        # Priority 1: test_results.json (non-simple variant)
-        test_results = path / "test_results.json"
-        if test_results.exists():
-            ingest_structured_report(test_results, conn)
+        # Priority 1: test_results.json (or its .msgpack twin)
+        test_result_files = _find_reports(path, "test_results")
+        if test_result_files:
+            ingest_structured_report(test_result_files[0], conn)
             return
         
-        # Priority 2: Look for test_results_*.json (excluding simple variant)
-        test_result_files = [f for f in path.glob("test_results_*.json") if "simple" not in f.name]
+        # Priority 2: Look for test_results_*.json/.msgpack (excluding simple variant)
+        test_result_files = _find_reports(path, "test_results_*")
         if test_result_files:
             for report in test_result_files:
                 ingest_structured_report(report, conn)
             return
         
         # Priority 3: Look in subdirectories for test_results_*.json
-        test_result_files = [f for f in path.glob("**/test_results_*.json") if "simple" not in f.name]
+        test_result_files = _find_reports(path, "**/test_results_*")
         if test_result_files:
             for report in test_result_files:
                 ingest_structured_report(report, conn)
@@ -228,11 +335,13 @@ if __name__ == "__main__":
         print("Usage: python ingestion_script.py <path1> [path2] ...")
         print("  Supports:")
         print("    - Direct JSON file: test_results_YYYYMMDD_HHMMSS.json")
+        print("    - Binary report: test_results_YYYYMMDD_HHMMSS.msgpack (requires msgspec)")
         print("    - Directory with test_results_*.json")
         print("    - Directory with legacy summary.json + junit.xml")
         sys.exit(1)
     
-    db = sqlite3.connect("db/results.sqlite")
+    # Autocommit mode: each ingest_* call manages its own BEGIN/COMMIT
+    db = sqlite3.connect("db/results.sqlite", isolation_level=None)
     ensure_schema(db)
     
     for path_str in sys.argv[1:]:
@@ -17,15 +17,19 @@ CREATE TABLE IF NOT EXISTS runs (
   operator_graph_version TEXT,
   notes TEXT,
   env TEXT,
-  schema_version TEXT
+  schema_version TEXT,
+  source_dir TEXT,
+  content_sha TEXT
 );
 
+CREATE INDEX IF NOT EXISTS idx_runs_timestamp ON runs(timestamp);
+
 CREATE TABLE IF NOT EXISTS tests (
   test_id INTEGER PRIMARY KEY AUTOINCREMENT,
   run_id TEXT,
   name TEXT,
   status TEXT,
-  duration_ms REAL,
+  duration_ms REAL NOT NULL DEFAULT 0,
   category TEXT,
   error_message TEXT,
   tags TEXT,
@@ -45,6 +49,8 @@ CREATE TABLE IF NOT EXISTS metrics (
   FOREIGN KEY(test_id) REFERENCES tests(test_id)
 );
 
+CREATE INDEX IF NOT EXISTS idx_metrics_name_scope ON metrics(name, scope);
+
 CREATE TABLE IF NOT EXISTS artifacts (
   artifact_id INTEGER PRIMARY KEY AUTOINCREMENT,
   run_id TEXT,
@@ -7,6 +7,8 @@ import sqlite3
 import json
 from pathlib import Path
 
+import numpy as np
+
 def format_row(headers, row, col_widths):
     """Format a single row with proper spacing"""
     parts = []
@@ -22,11 +24,9 @@ def print_table(headers, rows):
         print("(empty)")
         return
     
-    # Calculate column widths
-    col_widths = [len(h) for h in headers]
-    for row in rows:
-        for i, val in enumerate(row):
-            col_widths[i] = max(col_widths[i], len(str(val)) if val is not None else 4)
+    # Calculate column widths in one vectorized pass over all cells
+    cells = np.array([["NULL" if v is None else str(v) for v in row] for row in rows], dtype=str)
+    col_widths = np.maximum([len(h) for h in headers], np.char.str_len(cells).max(axis=0)).tolist()
     
     # Print header
     header_line = " | ".join(h.ljust(w) for h, w in zip(headers, col_widths))
@@ -46,17 +46,60 @@ Example:
 import json
 import time
 import os
-from datetime import datetime, timezone
-from dataclasses import dataclass, field, asdict
+import sys
+import warnings
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Set
+from typing import Dict, FrozenSet, Iterable, List, Optional, Any, Set
 from enum import Enum
 
+try:
+    import msgspec  # optional: pip install msgspec (C-level dataclass encoding)
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson  # optional: pip install orjson (C-level JSON with indent)
+except ImportError:
+    orjson = None
+
+
+def _enc_hook(obj: Any) -> Any:
+    """Convert values the JSON/msgpack encoders do not support natively (numpy scalars and arrays)"""
+    if type(obj).__module__ == "numpy":
+        # np.float64/np.int64/np.bool_ -> float/int/bool; arrays -> nested lists
+        return obj.item() if getattr(obj, "ndim", None) == 0 else obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# Reusable encoder; None when msgspec is not installed (json fallback is used)
+_ENCODER = msgspec.json.Encoder(enc_hook=_enc_hook) if msgspec is not None else None
+
+# Without msgspec/orjson, dataclasses must be converted to plain dicts for json.dumps
+_PLAIN_JSON = _ENCODER is None and orjson is None
+
+# write() emits many small chunks; a 1 MiB buffer coalesces them into few syscalls
+_WRITE_BUFFER_SIZE = 1 << 20
+
+
+def _dumps(obj: Any) -> bytes:
+    """Pretty-print (indent=2) obj as JSON bytes with the fastest available encoder"""
+    if _ENCODER is not None:
+        # msgspec encodes dataclasses directly and pretty-prints in C
+        return msgspec.json.format(_ENCODER.encode(obj), indent=2)
+    if orjson is not None:
+        # orjson serializes dataclasses natively, so no asdict() copy either
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_DATACLASS, default=_enc_hook)
+    return json.dumps(obj, indent=2, default=_enc_hook).encode()
+
 
 # ============================================================================
 # Enums & Constants
 # ============================================================================
 
+# Slotted dataclasses (smaller instances, faster attribute access) need Python 3.10+
+_DATACLASS_OPTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 class MetricScope(str, Enum):
     """Where a metric applies: to the entire run or per-test"""
     RUN = "run"
@@ -81,13 +124,14 @@ class TestStatus(str, Enum):
     FAIL = "fail"
     SKIP = "skip"
     PARTIAL = "partial"  # Some sub-checks passed, some failed
+    XFAIL = "xfail"  # Expected failure
 
 
 # ============================================================================
 # Metric Registry
 # ============================================================================
 
-@dataclass
+@dataclass(**_DATACLASS_OPTS)
 class MetricDefinition:
     """Metadata about a metric type"""
     name: str
@@ -97,6 +141,44 @@ class MetricDefinition:
     meta: Dict[str, Any] = field(default_factory=dict)
 
 
+# Common metrics every registry starts with: (name, unit, scope, description)
+_DEFAULT_METRICS = (
+    ("frame_gap_ms_mean", "ms", MetricScope.TEST, "Mean frame gap (jitter)"),
+    ("frame_gap_ms_p95", "ms", MetricScope.TEST, "95th percentile frame gap"),
+    ("frame_gap_ms_p99", "ms", MetricScope.TEST, "99th percentile frame gap"),
+    ("frame_gap_ms_max", "ms", MetricScope.TEST, "Maximum frame gap"),
+    ("drops", "count", MetricScope.TEST, "Number of dropped frames"),
+    ("latency_ms_mean", "ms", MetricScope.TEST, "Mean end-to-end latency"),
+    ("latency_ms_p95", "ms", MetricScope.TEST, "95th percentile latency"),
+    ("latency_ms_p99", "ms", MetricScope.TEST, "99th percentile latency"),
+    ("throughput_fps", "fps", MetricScope.TEST, "Frames per second"),
+    ("crc_pass_rate", "percent", MetricScope.TEST, "CRC validation pass rate"),
+    # PTP timing metrics
+    ("mean_frame_acquisition_ms", "ms", MetricScope.TEST, "Mean PTP frame acquisition time"),
+    ("min_frame_acquisition_ms", "ms", MetricScope.TEST, "Min PTP frame acquisition time"),
+    ("max_frame_acquisition_ms", "ms", MetricScope.TEST, "Max PTP frame acquisition time"),
+    ("p95_frame_acquisition_ms", "ms", MetricScope.TEST, "95th percentile PTP frame acquisition time"),
+    ("p99_frame_acquisition_ms", "ms", MetricScope.TEST, "99th percentile PTP frame acquisition time"),
+    ("stdev_frame_acquisition_us", "µs", MetricScope.TEST, "Std dev PTP frame acquisition time"),
+    ("mean_frame_interval_ms", "ms", MetricScope.TEST, "Mean PTP inter-frame interval"),
+    ("stdev_frame_interval_ms", "ms", MetricScope.TEST, "Std dev PTP inter-frame interval"),
+    ("frame_jitter_pct", "percent", MetricScope.TEST, "PTP frame jitter percentage"),
+    ("interval_fail_count", "count", MetricScope.TEST, "PTP frames outside tolerance"),
+    ("expected_interval_ms", "ms", MetricScope.TEST, "Expected PTP frame interval"),
+    ("test_duration_sec", "s", MetricScope.TEST, "PTP test duration"),
+    ("frames_captured", "count", MetricScope.TEST, "Total frames captured"),
+    ("valid_frames", "count", MetricScope.TEST, "Valid frames analyzed"),
+    ("invalid_frames", "count", MetricScope.TEST, "Invalid/rejected frames"),
+)
+
+# Built once at import; registries copy this dict instead of re-registering.
+# register() replaces entries rather than mutating them, so sharing is safe.
+_DEFAULT_METRIC_DEFINITIONS: Dict[str, MetricDefinition] = {
+    name: MetricDefinition(name=name, unit=unit, scope=scope, description=desc)
+    for name, unit, scope, desc in _DEFAULT_METRICS
+}
+
+
 class MetricRegistry:
     """
     Registry for defining metrics your test suite produces.
@@ -105,40 +187,14 @@ class MetricRegistry:
 
     def __init__(self):
         self._metrics: Dict[str, MetricDefinition] = {}
+        # Read-mostly snapshot of registered names, rebuilt on register()
+        self._metric_names: FrozenSet[str] = frozenset()
         self._register_defaults()
 
     def _register_defaults(self):
-        """Pre-register common metrics"""
-        common = [
-            ("frame_gap_ms_mean", "ms", MetricScope.TEST, "Mean frame gap (jitter)"),
-            ("frame_gap_ms_p95", "ms", MetricScope.TEST, "95th percentile frame gap"),
-            ("frame_gap_ms_p99", "ms", MetricScope.TEST, "99th percentile frame gap"),
-            ("frame_gap_ms_max", "ms", MetricScope.TEST, "Maximum frame gap"),
-            ("drops", "count", MetricScope.TEST, "Number of dropped frames"),
-            ("latency_ms_mean", "ms", MetricScope.TEST, "Mean end-to-end latency"),
-            ("latency_ms_p95", "ms", MetricScope.TEST, "95th percentile latency"),
-            ("latency_ms_p99", "ms", MetricScope.TEST, "99th percentile latency"),
-            ("throughput_fps", "fps", MetricScope.TEST, "Frames per second"),
-            ("crc_pass_rate", "percent", MetricScope.TEST, "CRC validation pass rate"),
-            # PTP timing metrics
-            ("mean_frame_acquisition_ms", "ms", MetricScope.TEST, "Mean PTP frame acquisition time"),
-            ("min_frame_acquisition_ms", "ms", MetricScope.TEST, "Min PTP frame acquisition time"),
-            ("max_frame_acquisition_ms", "ms", MetricScope.TEST, "Max PTP frame acquisition time"),
-            ("p95_frame_acquisition_ms", "ms", MetricScope.TEST, "95th percentile PTP frame acquisition time"),
-            ("p99_frame_acquisition_ms", "ms", MetricScope.TEST, "99th percentile PTP frame acquisition time"),
-            ("stdev_frame_acquisition_us", "µs", MetricScope.TEST, "Std dev PTP frame acquisition time"),
-            ("mean_frame_interval_ms", "ms", MetricScope.TEST, "Mean PTP inter-frame interval"),
-            ("stdev_frame_interval_ms", "ms", MetricScope.TEST, "Std dev PTP inter-frame interval"),
-            ("frame_jitter_pct", "percent", MetricScope.TEST, "PTP frame jitter percentage"),
-            ("interval_fail_count", "count", MetricScope.TEST, "PTP frames outside tolerance"),
-            ("expected_interval_ms", "ms", MetricScope.TEST, "Expected PTP frame interval"),
-            ("test_duration_sec", "s", MetricScope.TEST, "PTP test duration"),
-            ("frames_captured", "count", MetricScope.TEST, "Total frames captured"),
-            ("valid_frames", "count", MetricScope.TEST, "Valid frames analyzed"),
-            ("invalid_frames", "count", MetricScope.TEST, "Invalid/rejected frames"),
-        ]
-        for name, unit, scope, desc in common:
-            self.register(name, unit=unit, scope=scope, description=desc)
+        """Pre-register common metrics (shallow copy of the prebuilt definitions)"""
+        self._metrics.update(_DEFAULT_METRIC_DEFINITIONS)
+        self._metric_names = frozenset(self._metrics)
 
     def register(
         self,
@@ -156,6 +212,7 @@ class MetricRegistry:
             description=description,
             meta=meta or {},
         )
+        self._metric_names = frozenset(self._metrics)
 
     def get(self, name: str) -> Optional[MetricDefinition]:
         """Retrieve a metric definition"""
@@ -167,14 +224,18 @@ class MetricRegistry:
         If strict=False, unknown metrics are allowed (for extensibility).
         If strict=True, only registered metrics are allowed.
         """
-        return name in self._metrics or not strict
+        return name in self._metric_names or not strict
+
+    def unregistered(self, names: Iterable[str]) -> Set[str]:
+        """Return the subset of names that are not registered"""
+        return set(names) - self._metric_names
 
 
 # ============================================================================
 # Data Classes
 # ============================================================================
 
-@dataclass
+@dataclass(**_DATACLASS_OPTS)
 class Artifact:
     """A file artifact associated with a test or run"""
     type: str  # log, png, mp4, json, parquet, etc.
@@ -187,7 +248,7 @@ class Artifact:
         self.type = self.type.lower()
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTS)
 class TimeseriesData:
     """Time-series metric data (e.g., per-frame statistics)"""
     name: str  # Metric name (e.g., "frame_gap_ms")
@@ -196,12 +257,12 @@ class TimeseriesData:
     meta: Dict[str, Any] = field(default_factory=dict)  # source, compression, etc.
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTS)
 class TestEntry:
     """A single test result"""
     name: str
     test_id: str  # Required: Custom test identifier for traceability (e.g., "TC_7.1")
-    status: str  # "pass", "fail", "skip", "partial"
+    status: TestStatus  # "pass", "fail", "skip", "partial", "xfail" (strings are coerced)
     duration_ms: float
     metrics: Dict[str, Any] = field(default_factory=dict)
     error_message: Optional[str] = None
@@ -210,13 +271,16 @@ class TestEntry:
     tags: List[str] = field(default_factory=list)  # e.g., ["csi", "raw", "1080p60"]
 
     def __post_init__(self):
-        # Normalize status to lowercase
-        self.status = self.status.lower()
-        if self.status not in ("pass", "fail", "skip", "partial", "xfail"):
-            raise ValueError(f"Invalid status: {self.status}")
+        # Normalize status to the enum; it is a str subclass, so it serializes
+        # as the plain value and still compares equal to "pass", "fail", ...
+        status = self.status.lower()
+        try:
+            self.status = TestStatus(status)
+        except ValueError:
+            raise ValueError(f"Invalid status: {status}") from None
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTS)
 class RunReport:
     """
     Complete test run report with environment metadata, test results,
@@ -286,11 +350,21 @@ class RunReport:
             metric_registry: Optional registry for validation; if provided,
                            unknown metrics will generate warnings.
         """
+        # Tally statuses and durations in a single pass over the tests
         total = len(self.tests)
-        passed = sum(1 for t in self.tests if t.status == "pass")
-        failed = sum(1 for t in self.tests if t.status == "fail")
-        skipped = sum(1 for t in self.tests if t.status == "skip")
-        xfailed = sum(1 for t in self.tests if t.status == "xfail")
+        passed = failed = skipped = xfailed = 0
+        total_duration_ms = 0
+        for t in self.tests:
+            s = t.status
+            if s is TestStatus.PASS:
+                passed += 1
+            elif s is TestStatus.FAIL:
+                failed += 1
+            elif s is TestStatus.SKIP:
+                skipped += 1
+            elif s is TestStatus.XFAIL:
+                xfailed += 1
+            total_duration_ms += t.duration_ms
 
         # Determine overall status
         if failed > 0:
@@ -307,7 +381,6 @@ class RunReport:
         yield_rate = (passed / actual_tests) if actual_tests > 0 else None
 
         # Calculate total test time
-        total_duration_ms = sum(test.duration_ms for test in self.tests)
         total_duration_seconds = total_duration_ms / 1000.0
 
         self.summary = {
@@ -328,11 +401,14 @@ class RunReport:
 
         # Validate metrics against registry (if provided)
         if metric_registry:
-            for test in self.tests:
-                for metric_name in test.metrics.keys():
-                    if not metric_registry.validate(metric_name, strict=False):
-                        # Non-strict mode: warn but allow
-                        pass  # Could log warning here
+            metric_names = set().union(*(test.metrics.keys() for test in self.tests))
+            unknown = metric_registry.unregistered(metric_names)
+            if unknown:
+                # Non-strict mode: warn but allow
+                warnings.warn(
+                    f"Unregistered metrics in run {self.run_id}: {', '.join(sorted(unknown))}",
+                    stacklevel=2,
+                )
 
     def write(self, out_dir: Path, filename: str = "summary.json"):
         """
@@ -345,25 +421,125 @@ class RunReport:
         out_dir = Path(out_dir)
         out_dir.mkdir(parents=True, exist_ok=True)
 
-        # Convert dataclasses to dicts
-        payload = asdict(self)
-
         # Ensure None values for optional env vars are preserved (or could be filtered)
         # This format matches expectations of ingestion_script.py
+        sections = (
+            ("run_id", self.run_id),
+            ("env", self.env),
+            ("timestamp", self.timestamp),
+            ("schema_version", self.schema_version),
+            ("operator_graph_version", self.operator_graph_version),
+            ("notes", self.notes),
+            ("tests", self.tests),
+            ("summary", self.summary),
+            ("timeseries", self.timeseries),
+        )
+        streamed = {"tests": _test_to_jsonable, "timeseries": _timeseries_to_jsonable}
+
+        # Stream the document: each test/timeseries entry is encoded and written on
+        # its own, so the whole report is never held as one payload. Entries are
+        # re-indented to keep the same indent=2 layout as a single dump.
+        output_file = out_dir / filename
+        with output_file.open("wb", buffering=_WRITE_BUFFER_SIZE) as f:
+            f.write(b"{")
+            for i, (key, value) in enumerate(sections):
+                f.write(b'%s\n  "%s": ' % (b"," if i else b"", key.encode()))
+                if key not in streamed:
+                    f.write(_dumps(value).replace(b"\n", b"\n  "))
+                elif not value:
+                    f.write(b"[]")
+                else:
+                    to_plain = streamed[key]
+                    for j, item in enumerate(value):
+                        if _PLAIN_JSON:
+                            item = to_plain(item)
+                        f.write(b"%s\n    " % (b"," if j else b"["))
+                        f.write(_dumps(item).replace(b"\n", b"\n    "))
+                    f.write(b"\n  ]")
+            f.write(b"\n}")
+
+        return output_file
+
+    @classmethod
+    def from_json_bytes(cls, data: bytes) -> "RunReport":
+        """
+        Rebuild a report from the JSON written by write().
+        Uses a schema-driven msgspec decoder when available.
+        """
+        if _DECODER is not None:
+            return _DECODER.decode(data)
+
+        raw = json.loads(data)
+        tests = [
+            TestEntry(**{**t, "artifacts": [Artifact(**a) for a in t.get("artifacts", [])]})
+            for t in raw.pop("tests", [])
+        ]
+        timeseries = [TimeseriesData(**ts) for ts in raw.pop("timeseries", [])]
+        return cls(**raw, tests=tests, timeseries=timeseries)
+
+    def write_binary(self, out_dir: Path, filename: str = "summary.msgpack"):
+        """
+        Serialize report to a MessagePack file for the ingestion pipeline.
+        Smaller and faster to parse than JSON; write() stays the human-readable output.
+
+        Args:
+            out_dir: Directory to write the report to
+            filename: Output filename (default: summary.msgpack)
+        """
+        if msgspec is None:
+            raise ImportError("write_binary requires msgspec (pip install msgspec)")
+
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
 
         output_file = out_dir / filename
-        output_file.write_text(json.dumps(payload, indent=2))
+        output_file.write_bytes(msgspec.msgpack.encode(self, enc_hook=_enc_hook))
 
         return output_file
 
 
+# Schema-driven decoder for RunReport.from_json_bytes; reads the dataclass schema once
+_DECODER = msgspec.json.Decoder(RunReport) if msgspec is not None else None
+
+
 # ============================================================================
 # Utility Functions
 # ============================================================================
 
+# Plain-dict converters used by RunReport.write when neither msgspec nor orjson is
+# installed. Containers are reused as-is (no asdict() deep copy); keep the keys in
+# step with the dataclass fields.
+
+def _artifact_to_jsonable(a: Artifact) -> Dict[str, Any]:
+    return {"type": a.type, "path": a.path, "label": a.label, "meta": a.meta}
+
+
+def _test_to_jsonable(t: TestEntry) -> Dict[str, Any]:
+    return {
+        "name": t.name,
+        "test_id": t.test_id,
+        "status": t.status,
+        "duration_ms": t.duration_ms,
+        "metrics": t.metrics,
+        "error_message": t.error_message,
+        "artifacts": [_artifact_to_jsonable(a) for a in t.artifacts],
+        "category": t.category,
+        "tags": t.tags,
+    }
+
+
+def _timeseries_to_jsonable(ts: TimeseriesData) -> Dict[str, Any]:
+    return {"name": ts.name, "path": ts.path, "count": ts.count, "meta": ts.meta}
+
+
 def now_iso() -> str:
-    """Return current UTC timestamp in ISO format"""
-    return datetime.now(timezone.utc).isoformat()
+    """Return current UTC timestamp in ISO format (second precision)"""
+    # strftime on a struct_time avoids building a tz-aware datetime per call
+    return time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime())
+
+
+# GIT_SHA is fixed for the lifetime of a CI process; read it once
+_GIT_SHA = os.environ.get("GIT_SHA", "")[:6] or "local"
 
 
 def generate_run_id(prefix: str = "") -> str:
@@ -376,12 +552,7 @@ def generate_run_id(prefix: str = "") -> str:
     Returns:
         String like "2026-01-26_13-05-17_ab12cd" or "{prefix}2026-01-26_13-05-17..."
     """
-    timestamp = time.strftime("%Y-%m-%d_%H-%M-%S")
-    git_sha = os.environ.get("GIT_SHA", "")[:6] or "local"
-    run_id = f"{timestamp}_{git_sha}"
-    if prefix:
-        run_id = f"{prefix}{run_id}"
-    return run_id
+    return f"{prefix}{time.strftime('%Y-%m-%d_%H-%M-%S')}_{_GIT_SHA}"
 
 
 def create_report(
@@ -1,32 +1,138 @@
 
 # dashboard/app.py
-import sqlite3, pandas as pd
+import json, os, pathlib, sqlite3, pandas as pd
 import plotly.express as px
 import streamlit as st       # pip install streamlit plotly pandas
 
+try:
+    import connectorx as cx  # optional: pip install connectorx (Arrow-native reads)
+except ImportError:
+    cx = None
+
 st.set_page_config(page_title="HSB Test Dashboard", layout="wide")
 
+DB_PATH = "db/results.sqlite"
+
+def connect(db_path):
+    """
+    Open the results DB read-only. With the WAL journal set up at ingest time,
+    dashboard reads never block on (or take locks from) a running ingestion.
+    """
+    con = sqlite3.connect(pathlib.Path(db_path).resolve().as_uri() + "?mode=ro", uri=True)
+    con.execute("PRAGMA mmap_size=268435456")
+    return con
+
+def read_sql(db_path, con, query, params=()):
+    """
+    Run a query into a DataFrame. Parameter-less queries go through connectorx
+    when installed; otherwise rows are fetched in bulk and built with from_records,
+    skipping pandas' read_sql_query introspection.
+    """
+    if cx is not None and not params:
+        return cx.read_sql("sqlite://" + os.path.abspath(db_path), query)
+    cur = con.execute(query, params)
+    return pd.DataFrame.from_records(cur.fetchall(), columns=[col[0] for col in cur.description])
+
+@st.cache_data
+def load_tables(db_path, mtime):
+    """
+    Load runs, per-run test counts/yield and the distinct metric names;
+    mtime invalidates the cache when the DB changes.
+    """
+    con = connect(db_path)
+    runs = read_sql(db_path, con, "SELECT * FROM runs ORDER BY timestamp DESC")
+    runs = runs.astype({"fpga_bitstream": "category", "orin_image": "category"})
+    # Issue 1: Count xfail as pass. Yield and run metadata are computed here, under
+    # the cache, so reruns don't redo the per-run aggregation or merge.
+    per_run = read_sql(db_path, con, """
+        SELECT t.run_id,
+               COUNT(*) AS total,
+               SUM(t.status IN ('pass', 'xfail')) AS passed,
+               SUM(t.status = 'fail') AS failed,
+               100.0 * SUM(t.status IN ('pass', 'xfail')) / COUNT(*) AS yield_pct,
+               r.timestamp, r.fpga_bitstream, r.orin_image
+        FROM tests t
+        LEFT JOIN runs r USING (run_id)
+        GROUP BY t.run_id
+        ORDER BY r.timestamp
+    """)
+    per_run = per_run.astype({"fpga_bitstream": "category", "orin_image": "category"})
+    metric_names = [row[0] for row in con.execute(
+        "SELECT DISTINCT name FROM metrics WHERE name IS NOT NULL ORDER BY name")]
+    con.close()
+    return runs, per_run, metric_names
+
+@st.cache_data
+def load_metric_series(db_path, mtime, metric_name):
+    """Run-scope values of one metric joined with run metadata, filtered in SQLite"""
+    con = connect(db_path)
+    series = read_sql(db_path, con, """
+        SELECT m.run_id, m.value, r.timestamp, r.fpga_bitstream, r.orin_image
+        FROM metrics m JOIN runs r USING (run_id)
+        WHERE m.name = ? AND m.scope = 'run'
+        ORDER BY r.timestamp
+    """, (metric_name,))
+    con.close()
+    return series
+
+def metric_display_value(value, meta):
+    """Prefer the full array stored in meta over the first-element value column"""
+    if pd.notna(meta):
+        try:
+            meta_obj = json.loads(meta)
+            if "array" in meta_obj:
+                return meta_obj["array"]
+        except:
+            pass
+    return value
+
 @st.cache_data
-def load_tables(db_path="db/results.sqlite"):
-    con = sqlite3.connect(db_path)
-    runs = pd.read_sql_query("SELECT * FROM runs ORDER BY timestamp DESC", con)
-    tests = pd.read_sql_query("SELECT * FROM tests", con)
-    metrics = pd.read_sql_query("SELECT * FROM metrics", con)
-    artifacts = pd.read_sql_query("SELECT * FROM artifacts", con)
+def build_drilldown(db_path, mtime, run_id):
+    """
+    Build the drilldown for one run once per (run, DB state): the numbered
+    test table plus per-test metric display rows and artifacts.
+    """
+    con = connect(db_path)
+    run_tests = read_sql(db_path, con, """
+        SELECT test_id, name, status, COALESCE(duration_ms, 0.0) AS duration_ms, error_message
+        FROM tests WHERE run_id = ? ORDER BY test_id
+    """, (run_id,))
+    metrics = read_sql(db_path, con,
+        "SELECT test_id, name, value, meta FROM metrics WHERE run_id = ? AND test_id IS NOT NULL",
+        (run_id,))
+    artifacts = read_sql(db_path, con,
+        "SELECT test_id, type, path, label FROM artifacts WHERE run_id = ?", (run_id,))
     con.close()
-    return runs, tests, metrics, artifacts
 
-runs, tests, metrics, artifacts = load_tables()
+    run_tests["status"] = run_tests["status"].astype("category")
+    # Index starts from 1 for each run
+    run_tests.index = run_tests.index + 1
+    display_df = run_tests[["name","status","duration_ms","error_message"]]
+
+    # Display metrics with proper handling of complex types
+    metrics_by_test = {
+        test_id: pd.DataFrame({
+            "Metric": group["name"].tolist(),
+            "Value": [str(metric_display_value(v, m)) for v, m in zip(group["value"], group["meta"])],
+        })
+        for test_id, group in metrics.groupby("test_id")
+    }
+    artifacts_by_test = {test_id: group for test_id, group in artifacts.groupby("test_id")}
+    return run_tests, display_df, metrics_by_test, artifacts_by_test
+
+db_mtime = os.path.getmtime(DB_PATH)
+runs, per_run, metric_names = load_tables(DB_PATH, db_mtime)
+# run_id -> source_dir, used to resolve artifact paths in the drilldown
+RUN_SOURCE = dict(zip(runs["run_id"], runs["source_dir"]))
 
 st.title("Orin + FPGA HSB Test Dashboard")
 
 # KPI row
 col1, col2, col3, col4 = st.columns(4)
 total_runs = len(runs)
-total_tests = len(tests)
-# Issue 1: Count xfail as pass
-passed = ((tests["status"] == "pass") | (tests["status"] == "xfail")).sum()
-failed = (tests["status"] == "fail").sum()
+total_tests = int(per_run["total"].sum())
+passed = int(per_run["passed"].sum())
+failed = int(per_run["failed"].sum())
 yield_rate = (passed / total_tests * 100) if total_tests else 0
 col1.metric("Total Runs", total_runs)
 col2.metric("Total Tests", total_tests)
@@ -35,34 +141,18 @@ col4.metric("Yield Rate", f"{yield_rate:.1f}%")
 
 # Yield over time
 if not runs.empty:
-    # Derive per-run yield (Issue 1: treat xfail as pass)
-    per_run = tests.groupby("run_id").agg(
-        total=("status","size"),
-        passed=("status", lambda s: ((s=="pass") | (s=="xfail")).sum())
-    ).reset_index()
-    per_run["yield_pct"] = per_run["passed"]/per_run["total"]*100
-    per_run = per_run.merge(runs[["run_id","timestamp","fpga_bitstream","orin_image"]], on="run_id", how="left")
-    fig = px.line(per_run.sort_values("timestamp"),
+    # Per-run yield (Issue 1: treat xfail as pass), already ordered by timestamp
+    fig = px.line(per_run,
                   x="timestamp", y="yield_pct", color="fpga_bitstream",
                   markers=True, title="Yield Rate Over Time by Bitstream")
     st.plotly_chart(fig, use_container_width=True)
 
 # Run selector + drilldown
 run_sel = st.selectbox("Select a run", options=runs["run_id"].tolist())
-run_tests = tests[tests["run_id"] == run_sel].copy()
+run_tests, display_df, metrics_by_test, artifacts_by_test = build_drilldown(DB_PATH, db_mtime, run_sel)
 
 st.subheader(f"Run {run_sel} — Tests")
 
-# Reset index to start from 1 for each run
-run_tests = run_tests.reset_index(drop=True)
-run_tests.index = run_tests.index + 1
-
-# Ensure duration_ms shows properly (convert to numeric)
-run_tests["duration_ms"] = pd.to_numeric(run_tests["duration_ms"], errors='coerce').fillna(0)
-
-# Prepare display dataframe
-display_df = run_tests[["name","status","duration_ms","error_message"]].copy()
-
 # Add font color styling for status column
 def color_status(val):
     if val == "pass":
@@ -85,49 +175,25 @@ if not run_tests.empty:
     test_id = test_row["test_id"]
     
     # Get all metrics for this test
-    test_metrics = metrics[metrics["test_id"] == test_id]
+    test_metrics = metrics_by_test.get(test_id)
     
-    if not test_metrics.empty:
+    if test_metrics is not None:
         st.write(f"**Test:** {test_sel} | **Status:** {test_row['status']} | **Duration:** {test_row['duration_ms']}ms")
-        
-        # Display metrics with proper handling of complex types
-        import json
-        metrics_display = []
-        for _, metric in test_metrics.iterrows():
-            name = metric["name"]
-            value = metric["value"]
-            meta = metric.get("meta")
-            
-            # If meta contains array/complex data, use that instead
-            if pd.notna(meta):
-                try:
-                    meta_obj = json.loads(meta)
-                    if "array" in meta_obj:
-                        value = meta_obj["array"]
-                except:
-                    pass
-            
-            metrics_display.append({"Metric": name, "Value": str(value)})
-        
-        st.dataframe(pd.DataFrame(metrics_display), use_container_width=True)
+        st.dataframe(test_metrics, use_container_width=True)
     else:
         st.info("No metrics recorded for this test")
     
     # Display artifacts
-    test_artifacts = artifacts[artifacts["test_id"] == test_id]
-    if not test_artifacts.empty:
+    test_artifacts = artifacts_by_test.get(test_id)
+    if test_artifacts is not None:
         st.write("**Artifacts:**")
-        import os
         
-        # Get the source directory for this run from the runs table
-        run_info = runs[runs["run_id"] == run_sel]
-        run_source_dir = None
-        if not run_info.empty and "source_dir" in run_info.columns:
-            run_source_dir = run_info.iloc[0]["source_dir"]
-            if pd.notna(run_source_dir):
-                st.caption(f"Source directory: {run_source_dir}")
-            else:
-                st.caption("⚠️ No source_dir stored - re-run ingestion to enable dynamic path resolution")
+        # Get the source directory for this run (stored at ingest time)
+        run_source_dir = RUN_SOURCE.get(run_sel)
+        if pd.notna(run_source_dir):
+            st.caption(f"Source directory: {run_source_dir}")
+        else:
+            st.caption("⚠️ No source_dir stored - re-run ingestion to enable dynamic path resolution")
         
         for _, artifact in test_artifacts.iterrows():
             artifact_type = artifact["type"]
@@ -164,12 +230,10 @@ if not run_tests.empty:
 
 # # Compare anomalies/metrics across runs
 # st.subheader("Compare Metrics Across Runs")
-# metric_candidates = metrics["name"].dropna().unique().tolist()
-# metric_name = st.selectbox("Metric name", options=metric_candidates)
-# subset = metrics[(metrics["name"] == metric_name) & (metrics["scope"]=="run")]
-# if not subset.empty:
-#     df = subset.merge(runs[["run_id","timestamp","fpga_bitstream","orin_image"]], on="run_id", how="left")
-#     fig2 = px.scatter(df.sort_values("timestamp"), x="timestamp", y="value",
+# metric_name = st.selectbox("Metric name", options=metric_names)
+# df = load_metric_series(DB_PATH, db_mtime, metric_name)
+# if not df.empty:
+#     fig2 = px.scatter(df, x="timestamp", y="value",
 #                       color="fpga_bitstream", hover_data=["run_id","orin_image"],
 #                       title=f"{metric_name} over time")
 #     st.plotly_chart(fig2, use_container_width=True)
@@ -1,17 +1,23 @@
 
 import os
 import argparse
+import subprocess
 import sys
 import time
 from pathlib import Path
 from datetime import datetime
 
+# Upper bound for a programming run (normally 20 to 30 minutes)
+PROGRAM_TIMEOUT_S = 2400
+
 # Add parent scripts directory to path for imports
 _script_dir = Path(__file__).parent.parent / "scripts"
 sys.path.insert(0, str(_script_dir))
 
 #import control_tapo_kasa
 import terminal_print_formating as tpf
+import generate_manifest_md5
+from read_metadata import search_metadata_value
 
 def find_holoscan_dir():
     """
@@ -85,9 +91,7 @@ def main() -> tuple[bool, bool, bool, bool, bool]:
     holoscan_dir = find_holoscan_dir()
     ci_cd_dir = find_ci_cd_dir()
     
-    os.system(f"cd {ci_cd_dir}")
-
-    os.system('cls' if os.name == 'nt' else 'clear')
+    tpf.clear_screen()
     #tpf.print_img2char(f"{ci_cd_dir}/images/Lattice_Logo_Color_TransparentBG.png")
     tpf.print_start()
 
@@ -97,8 +101,8 @@ def main() -> tuple[bool, bool, bool, bool, bool]:
 
     args = parse_args()
  
-    os.system("echo Starting Bitstream Programmer Wrapper Script")
-    os.system("echo Locating bitstream file...")
+    print("Starting Bitstream Programmer Wrapper Script")
+    print("Locating bitstream file...")
     bitstream_path = args.bitstream_path 
     version = args.version 
     md5 = args.md5 
@@ -128,7 +132,6 @@ def main() -> tuple[bool, bool, bool, bool, bool]:
         raise SystemExit(2)
     if (peer_ip is not None) and ((fpga_uuid is  None) or (len(fpga_uuid) < 1)):
         # Query the device for its FPGA UUID
-        from read_metadata import search_metadata_value
         uuid = search_metadata_value(peer_ip, "fpga_uuid")
         if uuid is None:
             print(f"Exception thrown: Unable to query FPGA UUID from device at {peer_ip}. Please check connectivity and try again.")
@@ -167,39 +170,30 @@ def main() -> tuple[bool, bool, bool, bool, bool]:
     #print("FPGA UUID:", fpga_uuid[0])
     print("FPGA UUID:", fpga_uuid)
 
-    ori_argv = sys.argv.copy()
-
     print("Generating manifest file... ")
-    from generate_manifest_md5 import main as generate_manifest_main
-    
-    sys.argv = ([
-        "generate_manifest_md5.py", # argv[0] - script name required
-        "--version", version,
-        "--cpnx-file", bitstream_path,
-        "--fpga-uuid", fpga_uuid[0] if isinstance(fpga_uuid, list) else fpga_uuid,
-        "--peer-ip", peer_ip 
-    ])
-    if md5:  # Only add --md5 if it has a value
-        sys.argv.extend(["--md5", md5])
+    manifest_kwargs = {}
     if manifest:
-        sys.argv.extend(["--manifest", manifest])
+        manifest_kwargs["manifest"] = manifest
     if baj_detect:
         # Build absolute path to clnx bitstream file
         clnx_bitstream_path = ci_cd_dir / "bitstream" / "fpga_clnx_v2510.bit"
         if not clnx_bitstream_path.exists():
             print(f"[ERROR] CLNX bitstream file not found at: {clnx_bitstream_path}")
             raise SystemExit(2)
-        sys.argv.extend(["--clnx-file", str(clnx_bitstream_path)])
-    tmp, bitstream_ok = generate_manifest_main()
-    
-    sys.argv = ori_argv
+        manifest_kwargs["clnx_file"] = str(clnx_bitstream_path)
+    tmp, bitstream_ok = generate_manifest_md5.run(
+        version=version,
+        cpnx_file=bitstream_path,
+        fpga_uuid=[fpga_uuid[0] if isinstance(fpga_uuid, list) else fpga_uuid],
+        peer_ip=peer_ip,
+        md5=md5 or None,
+        **manifest_kwargs,
+    )
 
     manifest_file = manifest if manifest else "new_manifest.yaml"
     # Check original location first
     original_manifest_path = os.path.join(Path.cwd(), manifest_file)
     manifest_path = os.path.join(str(results_dir), manifest_file)
-    
-    time.sleep(0.2)  # wait for file system to catch up
 
     # If manifest was generated in original location, move it to results directory
     if os.path.isfile(original_manifest_path):
@@ -216,40 +210,35 @@ def main() -> tuple[bool, bool, bool, bool, bool]:
 
     print("Invoking bitstream programmer...")
     print("The process takes 20 to 30 minutes to complete.")
-    prog_start = time.time()
     if baj_detect:
-        os.system(f"cd {holoscan_dir} && program_lattice_cpnx100 --accept-eula --skip-power-cycle --skip-program-clnx --skip-verify-clnx {manifest_path}" )
+        program_cmd = ["program_lattice_cpnx100", "--accept-eula", "--skip-power-cycle",
+                       "--skip-program-clnx", "--skip-verify-clnx", manifest_path]
     else:
-        os.system(f"cd {holoscan_dir} && program_lattice_cpnx_versa --accept-eula --skip-power-cycle {manifest_path}" )
+        program_cmd = ["program_lattice_cpnx_versa", "--accept-eula", "--skip-power-cycle", manifest_path]
+    program_log = results_dir / "program_bitstream.log"
+    print(f"Programmer output is logged to: {program_log}")
+    prog_start = time.time()
+    with open(program_log, "w") as log:
+        try:
+            result = subprocess.run(program_cmd, cwd=str(holoscan_dir), stdout=log,
+                                    stderr=subprocess.STDOUT, text=True, timeout=PROGRAM_TIMEOUT_S)
+            program_success = result.returncode == 0
+        except subprocess.TimeoutExpired:
+            print(f"Exception thrown: Bitstream programmer timed out after {PROGRAM_TIMEOUT_S} seconds.")
+            program_success = False
     prog_end = time.time()
 
-    time.sleep(0.2) # soak time
-
-    print("Bitstream programming completed.")
+    print("Bitstream programming completed." if program_success else "Bitstream programming failed.")
     print(f"Total programming time: {prog_end - prog_start:.2f} seconds")
-    program_success = True
  
     # print("Power cycling the Hololink device to apply new bitstream...")
-    # sys.argv = ([
-    #     "control_tapo_kasa.py",
-    #     "--toggle_off", "4",
-    # ])
-    #control_tapo_kasa.main()
+    # print("Shutting down for 3 seconds...")
+    # control_tapo_kasa.cycle(4, off_s=3) # off and on over one plug session
 
     # with cr.RelayController():
     #     print("  Turning OFF relay 4 to power cycle the device...")
     #     cr.relay_xoff(4)
-
-    # print("Shutting down for 3 seconds...")
-    # time.sleep(3) # wait for device to power cycle
-
-    # sys.argv = ([
-    #     "control_tapo_kasa.py",
-    #     "--toggle_on", "4",
-    # ])
-    # control_tapo_kasa.main()
-
-    # with cr.RelayController():
+    #     time.sleep(3) # wait for device to power cycle
     #     print("  Turning ON relay 4 to complete power cycling the device...")
     #     cr.relay_xon(4)
 
@@ -5,13 +5,21 @@ Replaces Program_Bitstream.sh with pure Python for Windows/Linux/Jenkins compati
 """
 
 import argparse
+import functools
 import os
 import sys
 import subprocess
 import platform
+import re
+import shlex
 from pathlib import Path
 from typing import List, Optional
 
+try:
+    import docker
+except ImportError:
+    docker = None
+
 # Add parent scripts directory to path for imports
 _script_dir = Path(__file__).parent.parent / "eth_program_bitstream"
 sys.path.insert(0, str(_script_dir))
@@ -62,17 +70,42 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--max-saves", type=int, default=1, help="Maximum number of images to save during verification (0 = no images)")
     parser.add_argument("--workspace-root", type=str, default=None, help="Root directory of the holoscan-sensor-bridge workspace (auto-detected if not specified)")
     parser.add_argument("--dry-run", action="store_true", help="Print Docker command without executing")
+    parser.add_argument("--reuse-container", type=str, default=None, help="ID/name of a running hololink-demo container to program in via docker exec (skips docker run)")
     
     return parser.parse_args()
 
 
+_client = None
+
+
+def get_docker_client():
+    """
+    Shared Docker SDK client (one keep-alive connection to the daemon).
+    Returns None if the docker package is not installed or the daemon is unreachable.
+    """
+    global _client
+    if _client is None and docker is not None:
+        try:
+            _client = docker.from_env()
+        except docker.errors.DockerException:
+            return None
+    return _client
+
+
 def check_docker_available() -> bool:
     """Check if Docker is available and running."""
+    client = get_docker_client()
+    if client is not None:
+        try:
+            return client.ping()
+        except docker.errors.DockerException:
+            return False
+    
     try:
         result = subprocess.run(
             ["docker", "info"],
-            capture_output=True,
-            text=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
             check=False
         )
         return result.returncode == 0
@@ -80,70 +113,135 @@ def check_docker_available() -> bool:
         return False
 
 
+@functools.lru_cache(maxsize=4)
 def get_docker_version(workspace_root: str) -> str:
-    """Read VERSION file from workspace."""
+    """Read VERSION file from workspace (once per workspace per process)."""
     version_file = Path(workspace_root) / "VERSION"
     if not version_file.exists():
         print(f"Warning: VERSION file not found at {version_file}, using 'latest'")
         return "latest"
     
-    with open(version_file, 'r') as f:
-        return f.read().strip()
+    return version_file.read_text().strip()
+
+
+# Label on every container started from here, so leftovers can be pruned in one call
+CONTAINER_LABEL = "bitstream-programmer"
+
+
+def _build_script_argv(workspace_root: str) -> List[str]:
+    """The workspace's own image build (docker/build.sh), for the GPU type of this host."""
+    # Jetson (Orin/Thor) hosts have an integrated GPU; anything else builds the dGPU image
+    gpu_flag = "--igpu" if Path("/etc/nv_tegra_release").exists() else "--dgpu"
+    return ["bash", str(Path(workspace_root) / "docker" / "build.sh"), gpu_flag]
+
+
+def build_image_if_missing(docker_version: str, workspace_root: str) -> bool:
+    """
+    Make sure hololink-demo:{docker_version} exists, building it if missing.
+    The build goes through the workspace's docker/build.sh, which passes the
+    build args Dockerfile.demo expects and tags the image from VERSION.
+    """
+    image_name = f"hololink-demo:{docker_version}"
+    inspect_cmd = ["docker", "image", "inspect", image_name]
+    result = subprocess.run(inspect_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+    if result.returncode == 0:
+        return True
+    
+    build_cmd = _build_script_argv(workspace_root)
+    docker_dir = Path(workspace_root) / "docker"
+    if not Path(build_cmd[1]).exists():
+        print(f"Warning: image {image_name} not found and no build script at {build_cmd[1]}")
+        return False
+    
+    print(f"Image {image_name} not found, building it with: {shlex.join(build_cmd)}")
+    result = subprocess.run(build_cmd, cwd=str(docker_dir), check=False)
+    if result.returncode == 0:
+        result = subprocess.run(inspect_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+    if result.returncode != 0:
+        print(f"Error: building {image_name} failed. Build it manually, then re-run:")
+        print(f"  cd {docker_dir} && ./build.sh {build_cmd[2]}")
+        return False
+    return True
+
+
+@functools.lru_cache(maxsize=1)
+def resolve_image_tag(workspace_root: str) -> str:
+    """
+    hololink-demo image tag for the workspace VERSION, checked (and built if
+    missing) once per process. Exits with a clear error if it is unavailable,
+    rather than letting `docker run` fail later.
+    """
+    docker_version = get_docker_version(workspace_root)
+    image_name = f"hololink-demo:{docker_version}"
+    if not build_image_if_missing(docker_version, workspace_root):
+        raise SystemExit(f"Error: Docker image {image_name} is not available")
+    return image_name
 
 
 def cleanup_existing_container(container_name: str) -> None:
     """Remove existing container if it exists."""
     print(f"Checking for existing container '{container_name}'...")
     
-    # Check if container exists
+    client = get_docker_client()
+    if client is not None:
+        try:
+            container = client.containers.get(container_name)
+        except docker.errors.NotFound:
+            return
+        print(f"Removing existing container: {container_name}")
+        container.remove(force=True)
+        return
+    
+    # rm -f by name is a no-op (non-zero exit) when the container is absent,
+    # so no need to list every container on the host first
     result = subprocess.run(
-        ["docker", "ps", "-a", "--format", "{{.Names}}"],
+        ["docker", "rm", "-f", container_name],
         capture_output=True,
         text=True,
         check=False
     )
-    
-    if container_name in result.stdout.splitlines():
-        print(f"Removing existing container: {container_name}")
-        subprocess.run(
-            ["docker", "rm", "-f", container_name],
+    if result.returncode == 0:
+        print(f"Removed existing container: {container_name}")
+
+
+def enable_xhost() -> None:
+    """Let local root (the container) use the X display (Linux only, skipped when headless)."""
+    if platform.system() != "Linux" or not os.environ.get("DISPLAY"):
+        return
+    print("Enabling X11 access for local root (xhost +local:root)...")
+    try:
+        result = subprocess.run(
+            ["xhost", "+local:root"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
             check=False
         )
+        if result.returncode == 0:
+            print("✓ X11 access control enabled\n")
+        else:
+            print(f"Warning: xhost command returned code {result.returncode}\n")
+    except FileNotFoundError:
+        print("Warning: xhost not found, X11 forwarding may not work\n")
 
 
-def enable_xhost() -> None:
-    """Enable X11 forwarding (Linux only)."""
-    if platform.system() == "Linux":
-        print("Enabling X11 access control (xhost +)...")
-        try:
-            result = subprocess.run(["xhost", "+"], check=False, capture_output=True, text=True)
-            if result.returncode == 0:
-                print("✓ X11 access control enabled\n")
-            else:
-                print(f"Warning: xhost command returned code {result.returncode}\n")
-        except FileNotFoundError:
-            print("Warning: xhost not found, X11 forwarding may not work\n")
+@functools.lru_cache(maxsize=8)
+def _paths_exist(paths: tuple) -> tuple:
+    """os.path.exists for each volume source, memoized per set of paths."""
+    return tuple(map(os.path.exists, paths))
 
 
-def build_docker_command(
-    args: argparse.Namespace,
+def docker_run_options(
     workspace_root: str,
-    docker_version: str,
-    container_name: str = "demo_bitstream_prog"
+    container_name: str = "demo_bitstream_prog",
+    workdir: Optional[str] = None
 ) -> List[str]:
-    """Build the Docker run command with all necessary arguments."""
-    
-    image_name = f"hololink-demo:{docker_version}"
-    
-    # Base command
-    cmd = ["docker", "run"]
-    
-    # Add -it only if running in interactive terminal (not Jenkins)
-    if sys.stdout.isatty():
-        cmd.extend(["-it"])
-    
+    """
+    `docker run` flags shared by one-shot programming runs and the long-lived
+    pytest container: runtime flags, volume mounts, working directory and env.
+    The working directory defaults to workspace_root.
+    """
     # Standard flags
-    cmd.extend([
+    opts = [
         "--rm",
         "--net", "host",
         "--gpus", "all",
@@ -152,7 +250,8 @@ def build_docker_command(
         "--privileged",
         "--ulimit", "stack=33554432",
         "--name", container_name,
-    ])
+        "--label", CONTAINER_LABEL,
+    ]
     
     # Volume mounts
     # Extract home directory dynamically from workspace_root
@@ -171,14 +270,15 @@ def build_docker_command(
         ("/var/nvidia/nvcam/settings", "/var/nvidia/nvcam/settings"),
     ]
     
-    for host_path, container_path in volumes:
-        if Path(host_path).exists():
-            cmd.extend(["-v", f"{host_path}:{container_path}"])
+    exists_mask = _paths_exist(tuple(host_path for host_path, _ in volumes))
+    for (host_path, container_path), exists in zip(volumes, exists_mask):
+        if exists:
+            opts.extend(["-v", f"{host_path}:{container_path}"])
         else:
             print(f"Warning: Volume {host_path} does not exist, skipping mount")
     
     # Working directory
-    cmd.extend(["-w", workspace_root])
+    opts.extend(["-w", workdir or workspace_root])
     
     # Environment variables
     display = os.environ.get("DISPLAY", ":0")
@@ -193,34 +293,86 @@ def build_docker_command(
     }
     
     for key, value in env_vars.items():
-        cmd.extend(["-e", f"{key}={value}"])
+        opts.extend(["-e", f"{key}={value}"])
+    
+    return opts
+
+
+def programming_workdir(workspace_root: str) -> str:
+    """Directory eth_prog.py runs from inside the container."""
+    # Find CI_CD directory dynamically based on workspace root
+    return str(Path(workspace_root).parent / "CI_CD" / "eth_program_bitstream")
+
+
+def build_programming_command(args: argparse.Namespace) -> List[str]:
+    """
+    Argv run inside the container to program the bitstream.
+    Passed to docker as-is (no shell), so arguments need no quoting;
+    run it with programming_workdir() as the working directory.
+    """
+    cmd = [
+        "python3", "-u", "eth_prog.py",
+        "--version", args.version,
+        "--bitstream-path", args.bitstream_path,
+        "--peer-ip", args.peer_ip,
+        "--max-saves", str(args.max_saves),
+    ]
+    
+    if args.md5:
+        cmd.extend(["--md5", args.md5])
+    if args.manifest:
+        cmd.extend(["--manifest", args.manifest])
+    
+    return cmd
+
+
+def build_docker_command(
+    args: argparse.Namespace,
+    workspace_root: str,
+    image_name: str,
+    container_name: str = "demo_bitstream_prog"
+) -> List[str]:
+    """Build the Docker run command with all necessary arguments."""
+    
+    # Base command
+    cmd = ["docker", "run"]
+    
+    # Keep stdin attached in an interactive terminal (not Jenkins). No -t: the
+    # output is piped through run_docker_container(), and a PTY would rewrite
+    # line endings and merge stderr into it
+    if sys.stdin.isatty():
+        cmd.append("-i")
+    
+    cmd.extend(docker_run_options(workspace_root, container_name, workdir=programming_workdir(workspace_root)))
     
     # Image name
     cmd.append(image_name)
     
     # Command to run inside container - directly call Python script
-    # Find CI_CD directory dynamically based on workspace root
-    ci_cd_path = str(Path(workspace_root).parent / "CI_CD" / "eth_program_bitstream")
-    
-    python_cmd = (
-        f"cd {ci_cd_path} && "
-        f"python3 -u eth_prog.py "
-        f"--version '{args.version}' "
-        f"--bitstream-path '{args.bitstream_path}' "
-        f"--peer-ip '{args.peer_ip}' "
-        f"--max-saves {args.max_saves}"
-    )
+    cmd.extend(build_programming_command(args))
     
-    if args.md5:
-        python_cmd += f" --md5 '{args.md5}'"
-    if args.manifest:
-        python_cmd += f" --manifest '{args.manifest}'"
+    return cmd
+
+
+def build_exec_command(args: argparse.Namespace, workspace_root: str, container_id: str) -> List[str]:
+    """Build a `docker exec` command that programs inside an already running container."""
+    cmd = ["docker", "exec"]
+    
+    # -i only; see build_docker_command() for why there is no -t
+    if sys.stdin.isatty():
+        cmd.append("-i")
     
-    cmd.extend(["bash", "-lc", python_cmd])
+    cmd.extend(["-w", programming_workdir(workspace_root)])
+    cmd.append(container_id)
+    cmd.extend(build_programming_command(args))
     
     return cmd
 
 
+# eth_prog.py output that means the run cannot succeed; stop the container instead of waiting it out
+EARLY_FAIL_RE = re.compile(r"Exception thrown:|\[ERROR\]")
+
+
 def run_docker_container(cmd: List[str], dry_run: bool = False) -> int:
     """Execute the Docker command and return exit code."""
     
@@ -228,7 +380,7 @@ def run_docker_container(cmd: List[str], dry_run: bool = False) -> int:
         print("\n" + "=" * 90)
         print("DRY RUN - Docker command:")
         print("=" * 90)
-        print(" ".join(cmd))
+        print(shlex.join(cmd))
         print("=" * 90 + "\n")
         return 0
     
@@ -236,10 +388,21 @@ def run_docker_container(cmd: List[str], dry_run: bool = False) -> int:
     print("Invoking Docker container for bitstream programming...")
     print("=" * 90 + "\n")
     
+    proc = None
     try:
-        result = subprocess.run(cmd, check=False)
-        return result.returncode
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
+        for line in proc.stdout:
+            sys.stdout.write(line)
+            if EARLY_FAIL_RE.search(line):
+                print("\nFatal error reported inside the container, stopping it early")
+                proc.terminate()
+                rc = proc.wait()
+                # Negative return code = killed by our signal, report a plain failure
+                return rc if rc > 0 else 1
+        return proc.wait()
     except KeyboardInterrupt:
+        if proc is not None:
+            proc.terminate()
         print("\n\nInterrupted by user (Ctrl+C)")
         return 130
     except Exception as e:
@@ -284,9 +447,21 @@ def main() -> int:
         print("Error: Docker is not available or not running")
         return 1
     
-    # Get Docker version
-    docker_version = get_docker_version(args.workspace_root)
-    print(f"Using Docker image: hololink-demo:{docker_version}\n")
+    # Program inside an already running container: no image/xhost/cleanup steps
+    if args.reuse_container:
+        print(f"Reusing container: {args.reuse_container}\n")
+        cmd = build_exec_command(args, args.workspace_root, args.reuse_container)
+        exit_code = run_docker_container(cmd, dry_run=args.dry_run)
+        if not args.dry_run:
+            print_summary(exit_code)
+        return exit_code
+    
+    # Resolve (and on a real run, verify) the image tag
+    if args.dry_run:
+        image_name = f"hololink-demo:{get_docker_version(args.workspace_root)}"
+    else:
+        image_name = resolve_image_tag(args.workspace_root)
+    print(f"Using Docker image: {image_name}\n")
     
     # Enable X11 forwarding (Linux only)
     enable_xhost()
@@ -296,7 +471,7 @@ def main() -> int:
     cleanup_existing_container(container_name)
     
     # Build Docker command
-    cmd = build_docker_command(args, args.workspace_root, docker_version, container_name)
+    cmd = build_docker_command(args, args.workspace_root, image_name, container_name)
     
     # Run Docker container
     exit_code = run_docker_container(cmd, dry_run=args.dry_run)
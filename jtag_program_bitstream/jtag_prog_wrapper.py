@@ -5,9 +5,18 @@ Coordinates local FPGA programming via USB JTAG, then triggers Docker verificati
 """
 import logging
 import argparse
+import hashlib
+import json
+import functools
 import subprocess
 import sys
 import os
+import shlex
+import stat
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, Tuple
 import time
@@ -20,6 +29,157 @@ import control_tapo_kasa
 import terminal_print_formating as tpf
 
 
+# Base ssh/scp options; each wrapper adds its own ControlMaster socket on top
+SSH_OPTS = [
+    "-o", "BatchMode=yes",                    # Non-interactive, key auth only
+    "-o", "StrictHostKeyChecking=accept-new", # Auto-accept new host keys
+    # Prefer AES-GCM (hardware AES on x86 and the Orin's ARMv8 crypto extensions)
+    "-o", "Ciphers=aes128-gcm@openssh.com,chacha20-poly1305@openssh.com,"
+          "aes256-gcm@openssh.com,aes128-ctr,aes192-ctr,aes256-ctr",
+]
+
+# radiant_usb_programmer.py output that means programming failed (it exits 0 either
+# way). It exits right after printing these, followed only by its error details and
+# hints, so the run is left to finish rather than terminated.
+FPGA_FAILURE_MARKERS = (
+    "[✗ ERROR] Programming failed",
+    "[✗ ERROR] Failed after",
+    "[✗ ERROR] Configuration file not found",
+    "[✗ ERROR] Radiant Programmer not found",
+    "[✗ ERROR] Invalid device type",
+)
+# Output lines after which the Orin command can no longer succeed; it is terminated
+# on the first match instead of waiting for it to exit on its own.
+DOCKER_FATAL_MARKERS = (
+    "Unable to find image",
+    "docker: Error response from daemon",
+)
+
+# Fixed part of the Orin `docker run` command; the workspace mount, image and
+# container command are added per call by _docker_verify_cmd()
+DOCKER_RUN_ARGS = (
+    "docker", "run", "--rm", "--net", "host", "--gpus", "all", "--runtime=nvidia",
+    "--shm-size=1gb", "--privileged",
+    "-v", "/home/lattice:/home/lattice",
+    "-v", "/sys/bus/pci/devices:/sys/bus/pci/devices",
+    "-v", "/sys/kernel/mm/hugepages:/sys/kernel/mm/hugepages",
+    "-v", "/dev:/dev",
+    "-v", "/tmp/.X11-unix:/tmp/.X11-unix",
+    "-v", "/tmp/argus_socket:/tmp/argus_socket",
+    "-v", "/sys/devices:/sys/devices",
+    "-v", "/var/nvidia/nvcam/settings:/var/nvidia/nvcam/settings",
+    "-w", "/home/lattice/HSB/CI_CD",
+    "-e", "NVIDIA_DRIVER_CAPABILITIES=graphics,video,compute,utility,display",
+    "-e", "NVIDIA_VISIBLE_DEVICES=all",
+    "-e", "DISPLAY=:0",
+    "-e", "enableRawReprocess=2",
+)
+
+# Process exit codes, one per failing stage so CI can retry only that leg
+EXIT_OK = 0
+EXIT_FPGA_FAILED = 1      # Also used for unexpected errors (rerun everything)
+EXIT_POWERCYCLE_FAILED = 2
+EXIT_ORIN_FAILED = 3
+EXIT_INTERRUPTED = 130
+
+# Power-cycle timing: off time for the board to drain, then boot wait for the peer
+POWER_OFF_S = 1.0
+BOOT_TIMEOUT_S = 15.0
+BOOT_FALLBACK_S = 6.0
+
+# Anything smaller can't be a real bitstream (typo'd path, empty or truncated file)
+MIN_BITSTREAM_BYTES = 1024
+
+# Last bitstream successfully written to flash, per device type
+BITSTREAM_CACHE = Path.home() / ".cache" / "hsb" / "last_bitstream.json"
+CACHEABLE_OPERATION = "Erase,Program,Verify"
+
+
+def _bitstream_digest(path: str) -> str:
+    """SHA-256 of a bitstream file, read in 1 MiB chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _load_bitstream_cache() -> dict:
+    try:
+        return json.loads(BITSTREAM_CACHE.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _record_results_dir() -> Path:
+    """
+    Create a timestamped results directory and point ../results/temp.txt at it,
+    as radiant_usb_programmer.py does, for runs where the programmer is skipped.
+    """
+    results_root = Path.cwd().parent / "results"
+    results_dir = results_root / f"jtag_loc_programming_{time.strftime('%Y%m%d_%H%M%S')}"
+    results_dir.mkdir(parents=True, exist_ok=True)
+    (results_root / "temp.txt").write_text(str(results_dir))
+    return results_dir
+
+
+def _save_bitstream_cache(cache: dict):
+    try:
+        BITSTREAM_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        BITSTREAM_CACHE.write_text(json.dumps(cache, indent=2))
+    except OSError as e:
+        logging.warning("[⚠] Could not write bitstream cache: %s", e)
+
+@functools.lru_cache(maxsize=16)
+def _docker_verify_cmd(
+    peer_ip: str,
+    camera_id: int,
+    camera_mode: int,
+    frame_limit: int,
+    timeout_sec: int,
+    min_fps: float,
+    max_saves: int,
+    workspace_root: str,
+    version: Optional[str]
+) -> str:
+    """
+    Remote shell command that runs both verification scripts in one container.
+    
+    Every argument is quoted once here, so the remote shell never re-splits peer_ip,
+    paths, etc. Without a known version the tag is read from VERSION on the Orin.
+    """
+    # Verification scripts run back to back inside one container
+    verify_argv = [
+        "python3", "/home/lattice/HSB/CI_CD/scripts/verify_camera_imx258.py",
+        "--camera-ip", peer_ip,
+        "--camera-id", str(camera_id),
+        "--camera-mode", str(camera_mode),
+        "--frame-limit", str(frame_limit),
+        "--timeout", str(timeout_sec),
+        "--min-fps", str(min_fps),
+        "--max-saves", str(max_saves),
+        "--save-images",
+        "--save-dir", "/home/lattice/HSB/CI_CD",
+    ]
+    
+    # Chain with eth speed verification
+    eth_argv = ["python3", "/home/lattice/HSB/CI_CD/scripts/verify_eth_speed.py"]
+    
+    docker_argv = [
+        *DOCKER_RUN_ARGS,
+        "-v", f"{workspace_root}:{workspace_root}",
+        f"hololink-demo:{version or '__VERSION__'}",
+        "bash", "-c", f"{shlex.join(verify_argv)} && {shlex.join(eth_argv)}",
+    ]
+    
+    if version:
+        # exec: docker replaces the login shell, so a timeout/Ctrl+C reaches it directly
+        return "exec " + shlex.join(docker_argv)
+    return (
+        f"VERSION=$(cat {shlex.quote(workspace_root + '/VERSION')}) && "
+        + shlex.join(docker_argv).replace("hololink-demo:__VERSION__", 'hololink-demo:"$VERSION"')
+    )
+
 
 class JTAGProgrammerWrapper:
     """Wrapper for JTAG FPGA programming with remote Docker verification."""
@@ -35,6 +195,33 @@ class JTAGProgrammerWrapper:
         self.script_dir = Path(__file__).parent
         self.radiant_programmer = self.script_dir / "radiant_usb_programmer.py"
         
+        # Private ControlMaster socket dir: the first ssh/scp to a host opens a master
+        # connection that later calls reuse, so auth/handshake is paid once per host
+        self._ssh_opts = list(SSH_OPTS)
+        self._cm_dir = None
+        self._orin_hosts = set()
+        self._version_cache = {}
+        if os.name != 'nt':
+            self._cm_dir = tempfile.mkdtemp(prefix="hsb-ssh-")
+            self._ssh_opts += [
+                "-o", "ControlMaster=auto",
+                "-o", f"ControlPath={self._cm_dir}/cm-%r@%h:%p",
+                "-o", "ControlPersist=10m",
+            ]
+    
+    def close_orin_sessions(self):
+        """Shut down any SSH master connections opened by this wrapper."""
+        for orin_ip in self._orin_hosts:
+            try:
+                subprocess.run(["ssh", *self._ssh_opts, "-O", "exit", f"lattice@{orin_ip}"],
+                               timeout=5, check=False, capture_output=True)
+            except Exception:
+                pass
+        self._orin_hosts.clear()
+        if self._cm_dir:
+            shutil.rmtree(self._cm_dir, ignore_errors=True)
+            self._cm_dir = None
+        
     def _print_header(self, text: str):
         """Print formatted header."""
         print("\n" + "=" * 90)
@@ -43,19 +230,79 @@ class JTAGProgrammerWrapper:
     
     def _print_info(self, text: str):
         """Print info message."""
-        logging.info(f"{text}")
+        logging.info("%s", text)
     
     def _print_success(self, text: str):
         """Print success message."""
-        logging.info(f"[✓] {text}")
+        logging.info("[✓] %s", text)
     
     def _print_error(self, text: str):
         """Print error message."""
-        logging.error(f"[✗] {text}")
+        logging.error("[✗] %s", text)
     
     def _print_warning(self, text: str):
         """Print warning message."""
-        logging.warning(f"[⚠] {text}")
+        logging.warning("[⚠] %s", text)
+    
+    def _run_streaming(
+        self,
+        cmd: list,
+        fatal_markers: Tuple[str, ...] = (),
+        timeout: Optional[int] = None,
+        failure_markers: Tuple[str, ...] = ()
+    ) -> Tuple[int, Optional[str]]:
+        """
+        Run a command, echoing its output line by line as it arrives.
+        
+        Args:
+            cmd: Command and arguments (Python children need -u, or their piped
+                 output only arrives when they exit)
+            fatal_markers: Output substrings that terminate the command
+            timeout: Kill the command after this many seconds
+            failure_markers: Output substrings that mark the run failed without
+                             stopping it
+            
+        Returns:
+            (returncode, fatal_line) - fatal_line is the first line matching either
+            kind of marker, None if there was none
+            
+        Raises:
+            subprocess.TimeoutExpired: If the command ran longer than timeout
+        """
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                text=True, encoding="utf-8", errors="replace", bufsize=1)
+        timed_out = threading.Event()
+        
+        def _kill():
+            timed_out.set()
+            proc.kill()
+        
+        timer = threading.Timer(timeout, _kill) if timeout else None
+        if timer:
+            timer.start()
+        
+        fatal_line = None
+        terminated = False
+        try:
+            # Keep echoing after a match, so whatever the child prints on its
+            # way out (error details, hints) is still shown
+            for line in proc.stdout:
+                sys.stdout.write(line)
+                if not terminated and any(marker in line for marker in fatal_markers):
+                    fatal_line = fatal_line or line.strip()
+                    proc.terminate()
+                    terminated = True
+                elif fatal_line is None and any(marker in line for marker in failure_markers):
+                    fatal_line = line.strip()
+            proc.stdout.close()
+            proc.wait()
+        finally:
+            if timer:
+                timer.cancel()
+        
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        return proc.returncode, fatal_line
     
     def program_fpga(
         self,
@@ -63,26 +310,68 @@ class JTAGProgrammerWrapper:
         operation: str = "Erase,Program,Verify",
         config: Optional[str] = None,
         device_type: Optional[str] = None,
-        max_retries: int = 3
+        max_retries: int = 3,
+        force: bool = False
     ) -> Tuple[bool, str]:
         """
         Program FPGA via radiant_usb_programmer.py.
         
+        A full Erase,Program,Verify of the same bitstream that was last written
+        successfully is skipped unless force is set.
+        
         Args:
             bitstream_path: Path to bitstream file
             operation: Programming operation type
             config: Path to configuration file
             device_type: Device type ('cpnx' or 'avant')
             max_retries: Maximum retry attempts
+            force: Program even if the bitstream matches the cache
             
         Returns:
             (success, results_dir)
         """
         self._print_header("FPGA Programming via USB JTAG")
         
+        # Validate the bitstream before paying for interpreter + Radiant startup
+        try:
+            if os.stat(bitstream_path).st_size < MIN_BITSTREAM_BYTES:
+                raise ValueError(f"bitstream too small: {bitstream_path}")
+            with open(bitstream_path, "rb") as f:
+                f.read(16)
+        except (OSError, ValueError) as e:
+            self._print_error(f"Invalid bitstream: {e}")
+            return False, ""
+        
+        cache_key = device_type or "default"
+        cache = _load_bitstream_cache()
+        cache_entry = None
+        if operation == CACHEABLE_OPERATION:
+            try:
+                cache_entry = {
+                    "digest": _bitstream_digest(bitstream_path),
+                    "operation": operation,
+                    "mtime": os.path.getmtime(bitstream_path),
+                }
+            except OSError:
+                cache_entry = None
+        
+        if not force and cache_entry is not None and cache.get(cache_key) == cache_entry:
+            self._print_success("[cache hit] Bitstream already programmed, skipping")
+            # main() still collects the Orin images into a results directory
+            try:
+                return True, str(_record_results_dir())
+            except OSError as e:
+                self._print_warning(f"Could not create results directory: {e}")
+                return True, ""
+        
+        # Device contents are unknown until this run succeeds
+        if cache.pop(cache_key, None) is not None:
+            _save_bitstream_cache(cache)
+        
         # Build command
         cmd = [
             sys.executable,
+            "-u",  # stdout is a pipe here; unbuffered so lines stream as they are printed
             str(self.radiant_programmer),
             "--bitstream", bitstream_path,
             "--operation", operation,
@@ -101,10 +390,14 @@ class JTAGProgrammerWrapper:
         self._print_info(f"Executing: {' '.join(cmd)}")
         
         try:
-            result = subprocess.run(cmd, check=False, capture_output=False, text=True)
+            # radiant_usb_programmer.py exits 0 even on failure, so its output is checked too
+            returncode, fatal_line = self._run_streaming(cmd, failure_markers=FPGA_FAILURE_MARKERS)
 
-            if result.returncode == 0:
+            if returncode == 0 and fatal_line is None:
                 self._print_success("FPGA programming successful!")
+                if cache_entry is not None:
+                    cache[cache_key] = cache_entry
+                    _save_bitstream_cache(cache)
                 return True, ""
             else:
                 self._print_error("FPGA programming failed!")
@@ -115,86 +408,6 @@ class JTAGProgrammerWrapper:
             return False, ""
     
 
-    def trigger_orin_verification(
-        self,
-        orin_ip: str,
-        version: str,
-        bitstream_path: str,
-        peer_ip: str,
-        md5: str = "",
-        manifest: str = "",
-        max_saves: int = 1,
-        timeout: int = 600
-    ) -> bool:
-        """
-        Trigger Docker on Jetson Orin for verification.
-        
-        Uses SSH to execute program_bitstream_docker.py on the Jetson Orin.
-        
-        Args:
-            orin_ip: IP address of Jetson Orin
-            version: Bitstream version
-            bitstream_path: Path to bitstream file
-            peer_ip: Hololink device IP address
-            md5: MD5 checksum (optional)
-            manifest: Manifest file path (optional)
-            max_saves: Maximum number of images to save
-            timeout: Command timeout in seconds
-            
-        Returns:
-            True if successful, False otherwise
-        """
-        self._print_header("Triggering Jetson Orin Docker Verification")
-        
-        # Build remote command
-        remote_cmd = [
-            "python3",
-            "/home/lattice/HSB/CI_CD/scripts/verify_camera_imx258.py",
-            "--camera-ip", version,
-            "--camera-mode", bitstream_path,
-            "--save-images", peer_ip,
-            "--max-saves", str(max_saves),
-            "--save-dir", dir
-        ]
-        
-        if md5:
-            remote_cmd.extend(["--md5", md5])
-        
-        if manifest:
-            remote_cmd.extend(["--manifest", manifest])
-        
-        # Build SSH command
-        ssh_cmd = ["ssh", f"lattice@{orin_ip}"] + remote_cmd
-        
-        self._print_info(f"Target Orin IP: {orin_ip}")
-        self._print_info(f"Executing remote command: {' '.join(remote_cmd)}")
-        
-        try:
-            result = subprocess.run(
-                ssh_cmd,
-                timeout=timeout,
-                check=False,
-                capture_output=False,
-                text=True
-            )
-            
-            if result.returncode == 0:
-                self._print_success("Jetson Orin verification completed successfully!")
-                return True
-            else:
-                self._print_error(f"Jetson Orin verification failed with exit code: {result.returncode}")
-                return False
-        
-        except subprocess.TimeoutExpired:
-            self._print_error(f"Remote command timeout after {timeout} seconds")
-            return False
-        except FileNotFoundError:
-            self._print_error("SSH not found. Ensure SSH client is installed and in PATH")
-            return False
-        except Exception as e:
-            self._print_error(f"Exception during remote execution: {e}")
-            return False
-    
     def trigger_orin_docker_verify(
         self,
         orin_ip: str,
@@ -224,7 +437,7 @@ class JTAGProgrammerWrapper:
             timeout_sec: Timeout for frame capture in seconds
             min_fps: Minimum acceptable FPS
             max_saves: Maximum number of images to save
-            save_images: Whether to save captured frame images
+            save_images: Whether to save captured frame images (frames are always saved)
             timeout: SSH command timeout in seconds
             workspace_root: Root directory of holoscan-sensor-bridge workspace
             
@@ -233,57 +446,16 @@ class JTAGProgrammerWrapper:
         """
         self._print_header("Triggering Jetson Orin Docker Verification")
         
-        # Build a single SSH command that reads VERSION and runs both verification scripts in one container
-        # This avoids multiple password prompts by combining into one SSH call
-        combined_cmd = (
-            f"VERSION=$(cat {workspace_root}/VERSION) && "
-            f"docker run --rm --net host --gpus all --runtime=nvidia "
-            f"--shm-size=1gb --privileged "
-            f"-v {workspace_root}:{workspace_root} "
-            f"-v /home/lattice:/home/lattice "
-            f"-v /sys/bus/pci/devices:/sys/bus/pci/devices "
-            f"-v /sys/kernel/mm/hugepages:/sys/kernel/mm/hugepages "
-            f"-v /dev:/dev "
-            f"-v /tmp/.X11-unix:/tmp/.X11-unix "
-            f"-v /tmp/argus_socket:/tmp/argus_socket "
-            f"-v /sys/devices:/sys/devices "
-            f"-v /var/nvidia/nvcam/settings:/var/nvidia/nvcam/settings "
-            f"-w /home/lattice/HSB/CI_CD "
-            f"-e NVIDIA_DRIVER_CAPABILITIES=graphics,video,compute,utility,display "
-            f"-e NVIDIA_VISIBLE_DEVICES=all "
-            f"-e DISPLAY=:0 "
-            f"-e enableRawReprocess=2 "
-            f"hololink-demo:$VERSION "
-            f"bash -c '"
-            f"python3 /home/lattice/HSB/CI_CD/scripts/verify_camera_imx258.py "
-            f"--camera-ip {peer_ip} "
-            f"--camera-id {camera_id} "
-            f"--camera-mode {camera_mode} "
-            f"--frame-limit {frame_limit} "
-            f"--timeout {timeout_sec} "
-            f"--min-fps {min_fps} "
-            f"--max-saves {max_saves} "
-            f"--save-images "
-            f"--save-dir /home/lattice/HSB/CI_CD"
-        )
-        
-        if save_images:
-            combined_cmd += " --save-images"
-        
-        # Chain with eth speed verification
-        combined_cmd += (
-            f" && python3 /home/lattice/HSB/CI_CD/scripts/verify_eth_speed.py"
-            f"'"
+        # Single SSH command that starts the container
+        version = self._get_remote_version(orin_ip, workspace_root)
+        combined_cmd = _docker_verify_cmd(
+            peer_ip, camera_id, camera_mode, frame_limit, timeout_sec,
+            min_fps, max_saves, workspace_root, version
         )
         
         # Single SSH command with key-based auth (non-interactive, no password prompt)
-        ssh_cmd = [
-            "ssh",
-            "-o", "BatchMode=yes",                    # Non-interactive, key auth only
-            "-o", "StrictHostKeyChecking=accept-new", # Auto-accept new host keys
-            f"lattice@{orin_ip}",
-            combined_cmd
-        ]
+        ssh_cmd = ["ssh", *self._ssh_opts, f"lattice@{orin_ip}", combined_cmd]
+        self._orin_hosts.add(orin_ip)
         
         self._print_info(f"Target Orin IP: {orin_ip}")
         self._print_info(f"Peer (Camera) IP: {peer_ip}")
@@ -291,19 +463,16 @@ class JTAGProgrammerWrapper:
         self._print_info("Starting Docker container on Orin for verification...")
         
         try:
-            result = subprocess.run(
-                ssh_cmd,
-                timeout=timeout,
-                check=False,
-                capture_output=False,
-                text=True
-            )
+            returncode, fatal_line = self._run_streaming(ssh_cmd, DOCKER_FATAL_MARKERS, timeout=timeout)
             
-            if result.returncode == 0:
+            if fatal_line is not None:
+                self._print_error(f"Docker verification aborted: {fatal_line}")
+                return False
+            if returncode == 0:
                 self._print_success("Jetson Orin Docker verification completed successfully!")
                 return True
             else:
-                self._print_error(f"Docker verification failed with exit code: {result.returncode}")
+                self._print_error(f"Docker verification failed with exit code: {returncode}")
                 return False
         
         except subprocess.TimeoutExpired:
@@ -316,6 +485,208 @@ class JTAGProgrammerWrapper:
             self._print_error(f"Exception during remote execution: {e}")
             return False
 
+    def open_orin_session(self, orin_ip: str, timeout: int = 15) -> bool:
+        """
+        Open the shared SSH master connection to the Orin up front.
+        
+        The verify, copy and delete steps then all multiplex over this one
+        authenticated session instead of each doing its own key exchange.
+        
+        Args:
+            orin_ip: IP address of Jetson Orin
+            timeout: Connection timeout in seconds
+            
+        Returns:
+            True if a master connection is available, False otherwise
+        """
+        if os.name == 'nt':
+            return False  # No ControlMaster support in Windows OpenSSH
+        
+        target = f"lattice@{orin_ip}"
+        self._orin_hosts.add(orin_ip)
+        try:
+            check = subprocess.run(["ssh", *self._ssh_opts, "-O", "check", target],
+                                   timeout=timeout, check=False, capture_output=True)
+            if check.returncode == 0:
+                return True
+            
+            # -f backgrounds the master, so don't hold its stdout/stderr pipes open
+            result = subprocess.run(["ssh", *self._ssh_opts, "-M", "-N", "-f", target],
+                                    timeout=timeout, check=False,
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except (subprocess.TimeoutExpired, FileNotFoundError) as e:
+            self._print_warning(f"Could not open SSH session to Orin: {e}")
+            return False
+        
+        if result.returncode != 0:
+            self._print_warning("Could not open SSH session to Orin, falling back to per-call connections")
+            return False
+        return True
+
+    def _get_remote_version(self, orin_ip: str, workspace_root: str, timeout: int = 30) -> Optional[str]:
+        """
+        Read the hololink-demo image tag from the Orin workspace VERSION file.
+        
+        Memoized per (orin_ip, workspace_root), so the remote file is read at most
+        once per wrapper. Returns None if it can't be read.
+        """
+        key = (orin_ip, workspace_root)
+        if key in self._version_cache:
+            return self._version_cache[key]
+        
+        cat_cmd = ["ssh", *self._ssh_opts, f"lattice@{orin_ip}",
+                   f"cat {shlex.quote(workspace_root + '/VERSION')}"]
+        try:
+            result = subprocess.run(cat_cmd, timeout=timeout, check=False,
+                                    capture_output=True, text=True)
+        except (subprocess.TimeoutExpired, FileNotFoundError) as e:
+            self._print_warning(f"Could not read VERSION from Orin: {e}")
+            return None
+        
+        version = result.stdout.strip() if result.returncode == 0 else ""
+        if not version:
+            self._print_warning(f"Could not read {workspace_root}/VERSION on Orin")
+            return None
+        
+        self._version_cache[key] = version
+        return version
+    
+    def prewarm_orin(
+        self,
+        orin_ip: str,
+        workspace_root: str = "/home/lattice/HSB/holoscan-sensor-bridge",
+        timeout: int = 30
+    ) -> bool:
+        """
+        Prepare the Orin while the FPGA is still being programmed.
+        
+        Opens the shared SSH session and checks the hololink-demo image, so neither
+        sits on the critical path after the power cycle.
+        
+        Args:
+            orin_ip: IP address of Jetson Orin
+            workspace_root: Root directory of holoscan-sensor-bridge workspace
+            timeout: SSH command timeout in seconds
+            
+        Returns:
+            True if the Orin is reachable and the image is present, False otherwise
+        """
+        self.open_orin_session(orin_ip)
+        
+        version = self._get_remote_version(orin_ip, workspace_root, timeout=timeout)
+        if not version:
+            return False
+        
+        inspect_cmd = [
+            "ssh", *self._ssh_opts,
+            f"lattice@{orin_ip}",
+            f"docker image inspect {shlex.quote(f'hololink-demo:{version}')} > /dev/null"
+        ]
+        try:
+            result = subprocess.run(inspect_cmd, timeout=timeout, check=False,
+                                    capture_output=True, text=True)
+        except (subprocess.TimeoutExpired, FileNotFoundError) as e:
+            self._print_warning(f"Orin prewarm failed: {e}")
+            return False
+        
+        if result.returncode != 0:
+            self._print_warning("hololink-demo image not found on Orin, verification will likely fail")
+            return False
+        return True
+
+    def wait_for_peer(
+        self,
+        orin_ip: str,
+        peer_ip: str,
+        timeout: float = BOOT_TIMEOUT_S,
+        interval: float = 0.2
+    ) -> bool:
+        """
+        Wait until the Hololink device answers ping from the Orin.
+        
+        The device sits on the Orin's network, so the poll loop runs there in a
+        single SSH call over the shared session.
+        
+        Args:
+            orin_ip: IP address of Jetson Orin
+            peer_ip: Hololink device IP address
+            timeout: Give up after this many seconds
+            interval: Delay between pings in seconds
+            
+        Returns:
+            True once the device responds, False on timeout or SSH failure
+        """
+        poll = (
+            f"until ping -c 1 -W 1 {shlex.quote(peer_ip)} > /dev/null 2>&1; "
+            f"do sleep {interval}; done"
+        )
+        wait_cmd = [
+            "ssh", *self._ssh_opts,
+            f"lattice@{orin_ip}",
+            f"timeout {int(timeout)} sh -c {shlex.quote(poll)}"
+        ]
+        try:
+            result = subprocess.run(wait_cmd, timeout=timeout + 10, check=False,
+                                    capture_output=True, text=True)
+        except (subprocess.TimeoutExpired, FileNotFoundError):
+            return False
+        return result.returncode == 0
+
+    def transfer_and_clear_from_orin(
+        self,
+        orin_ip: str,
+        remote_dir: str,
+        local_dir: str,
+        extensions: list = None,
+        timeout: int = 60
+    ) -> Tuple[bool, bool]:
+        """
+        Move image files from Orin to local_dir.
+        
+        Uses one `rsync --remove-source-files` pass when rsync is installed, so each file
+        is deleted on the Orin as soon as it has been copied. Falls back to
+        copy_images_from_orin() followed by del_images_from_orin() otherwise.
+        
+        Returns:
+            (copy_success, delete_success)
+        """
+        if extensions is None:
+            extensions = ["*.npy","*.png"]  # Copy both raw and preview images
+        
+        if not shutil.which("rsync"):
+            copy_success = self.copy_images_from_orin(orin_ip, remote_dir, local_dir, extensions, timeout)
+            if not copy_success:
+                return False, False
+            return True, self.del_images_from_orin(orin_ip, remote_dir, local_dir, extensions, timeout)
+        
+        os.makedirs(local_dir, exist_ok=True)
+        
+        ext_list = ", ".join(extensions)
+        self._print_info(f"Moving {ext_list} files...")
+        
+        rsync_cmd = [
+            "rsync", "-az", "--remove-source-files",
+            "-e", shlex.join(["ssh", *self._ssh_opts]),
+            *[f"--include={ext}" for ext in extensions],
+            "--exclude=*",
+            f"lattice@{orin_ip}:{remote_dir}/",
+            local_dir
+        ]
+        
+        try:
+            result = subprocess.run(rsync_cmd, timeout=timeout, check=False,
+                                    capture_output=True, text=True)
+        except subprocess.TimeoutExpired:
+            self._print_warning(f"Image transfer timeout after {timeout} seconds")
+            return False, False
+        
+        if result.returncode == 0:
+            self._print_success(f"Moved {ext_list} files")
+            return True, True
+        
+        self._print_warning(f"Moving {ext_list} files failed: {result.stderr.strip()}")
+        return False, False
+
     def copy_images_from_orin(self, orin_ip: str, remote_dir: str, local_dir: str, extensions: list = None, timeout: int = 60) -> bool:
         """Copy multiple file types from Orin."""
         if extensions is None:
@@ -323,24 +694,23 @@ class JTAGProgrammerWrapper:
         
         os.makedirs(local_dir, exist_ok=True)
         
-        for ext in extensions:
-            self._print_info(f"Copying {ext} files...")
-            
-            scp_cmd = [
-                "scp", "-r",
-                "-o", "BatchMode=yes",
-                "-o", "StrictHostKeyChecking=accept-new",
-                f"lattice@{orin_ip}:{remote_dir}/{ext}",
-                local_dir
-            ]
-            
-            result = subprocess.run(scp_cmd, timeout=timeout, check=False, 
-                                capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                self._print_success(f"Copied {ext} files")
-            else:
-                self._print_warning(f"No {ext} files found or copy failed")
+        ext_list = ", ".join(extensions)
+        self._print_info(f"Copying {ext_list} files...")
+        
+        # One scp process for all patterns instead of one connection per extension
+        scp_cmd = [
+            "scp", "-r", *self._ssh_opts,
+            *[f"lattice@{orin_ip}:{remote_dir}/{ext}" for ext in extensions],
+            local_dir
+        ]
+        
+        result = subprocess.run(scp_cmd, timeout=timeout, check=False, 
+                            capture_output=True, text=True)
+        
+        if result.returncode == 0:
+            self._print_success(f"Copied {ext_list} files")
+        else:
+            self._print_warning(f"Some of {ext_list} files not found or copy failed")
         
         return True
     
@@ -349,24 +719,25 @@ class JTAGProgrammerWrapper:
         if extensions is None:
             extensions = ["*.npy","*.png"]  # Copy both raw and preview images
               
-        for ext in extensions:
-            self._print_info(f"Copying {ext} files...")
-            
-            delete_cmd = [
-                "ssh",
-                "-o", "BatchMode=yes",
-                "-o", "StrictHostKeyChecking=accept-new",
-                f"lattice@{orin_ip}",
-                f"rm -rf {remote_dir}/{ext}"
-            ]
-            
-            result = subprocess.run(delete_cmd, timeout=timeout, check=False, 
-                                capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                self._print_success(f"Deleted {ext} files")
-            else:
-                self._print_warning(f"No {ext} files found or delete failed")
+        ext_list = ", ".join(extensions)
+        self._print_info(f"Deleting {ext_list} files...")
+        
+        # One find -delete for all patterns: matched names never pass through a shell
+        # glob into argv, and only plain files directly in remote_dir are touched
+        name_tests = " -o ".join(f"-name {shlex.quote(ext)}" for ext in extensions)
+        delete_cmd = [
+            "ssh", *self._ssh_opts,
+            f"lattice@{orin_ip}",
+            f"find {shlex.quote(remote_dir)} -maxdepth 1 -type f \\( {name_tests} \\) -delete"
+        ]
+        
+        result = subprocess.run(delete_cmd, timeout=timeout, check=False, 
+                            capture_output=True, text=True)
+        
+        if result.returncode == 0:
+            self._print_success(f"Deleted {ext_list} files")
+        else:
+            self._print_warning(f"No {ext_list} files found or delete failed")
         
         return True
 
@@ -434,10 +805,16 @@ Examples:
         default=3,
         help="Maximum retry attempts on cable errors (default: 3)"
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Program even if this bitstream was already programmed successfully"
+    )
     
     # Jetson Orin verification arguments
     parser.add_argument(
         "--host-ip",
+        dest="orin_ip",
         type=str,
         required=True,
         help="IP address of Nvidia Device (triggers Docker verification if provided)"
@@ -507,8 +884,8 @@ Examples:
 
 
 
-def main() -> Tuple[bool, bool, bool]:
-    """Main entry point."""
+def main() -> int:
+    """Main entry point. Returns one of the EXIT_* codes."""
     args = parse_args()
     
     # Configure logging
@@ -517,66 +894,76 @@ def main() -> Tuple[bool, bool, bool]:
         format='%(levelname)s: %(message)s'
     )
     
+    wrapper = None
     try:
-        os.system("cd /home/lattice/HSB/CI_CD")
-
-        os.system('cls' if os.name == 'nt' else 'clear')
+        tpf.clear_screen()
         tpf.print_start()
 
         prog_start = time.time()
 
         wrapper = JTAGProgrammerWrapper(verbose=args.verbose)
         
-        # Step 1: Program FPGA via USB JTAG
-        success, results_dir = wrapper.program_fpga(
-            bitstream_path=args.bitstream,
-            operation="Fast Configuration" if args.fast else args.operation,
-            config=args.config,
-            device_type=args.device_type,
-            max_retries=args.max_retries
-        )
+        # Step 1: Program FPGA via USB JTAG, prewarming the Orin in parallel
+        # (SSH session and image check don't depend on the bitstream)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            if args.orin_ip:
+                executor.submit(wrapper.prewarm_orin, args.orin_ip)
+            
+            success, results_dir = wrapper.program_fpga(
+                bitstream_path=args.bitstream,
+                operation="Fast Configuration" if args.fast else args.operation,
+                config=args.config,
+                device_type=args.device_type,
+                max_retries=args.max_retries,
+                force=args.force
+            )
         
         if not success:
             wrapper._print_error("FPGA programming failed. Aborting workflow.")
-            return 1
+            return EXIT_FPGA_FAILED
         
         prog_end = time.time()
 
         logging.info("Bitstream programming completed.")
-        logging.info(f"Total programming time: {prog_end - prog_start:.2f} seconds")
-        program_success = True
+        logging.info("Total programming time: %.2f seconds", prog_end - prog_start)
     
         logging.info("Power cycling the Hololink device to apply new bitstream...")
-        sys.argv = ([
-            "control_tapo_kasa.py",
-            "--toggle_off", "4",
-        ])
-        control_tapo_kasa.main()
-
-        logging.info("Shutting down for 3 seconds...")
-        time.sleep(3) # wait for device to power cycle
-
-        sys.argv = ([
-            "control_tapo_kasa.py",
-            "--toggle_on", "4",
-        ])
-        control_tapo_kasa.main()
+        logging.info("Shutting down for %g seconds...", POWER_OFF_S)
+        try:
+            control_tapo_kasa.cycle(4, off_s=POWER_OFF_S) # let the board drain before power on
+        except Exception as e:
+            wrapper._print_error(f"Power cycle failed: {e}")
+            return EXIT_POWERCYCLE_FAILED
 
-        logging.info("Waiting for device to boot up for 6 seconds...")
-        time.sleep(6) # wait for device to boot up
+        peer_ready = False
+        if args.orin_ip and args.peer_ip:
+            logging.info("Waiting up to %g seconds for device to boot up...", BOOT_TIMEOUT_S)
+            boot_start = time.time()
+            peer_ready = wrapper.wait_for_peer(args.orin_ip, args.peer_ip)
+            if peer_ready:
+                logging.info("Device reachable after %.1f seconds", time.time() - boot_start)
+            else:
+                wrapper._print_warning(f"Device at {args.peer_ip} not answering ping, continuing anyway")
+        else:
+            logging.info("Waiting for device to boot up for %g seconds...", BOOT_FALLBACK_S)
+            time.sleep(BOOT_FALLBACK_S) # wait for device to boot up
 
-        powercycle_ok = True
         logging.info("Hololink device power cycled successfully.")
 
         # Step 2: Trigger Jetson Orin verification (if requested)
         if args.orin_ip:
             # Validate required arguments for Orin
             if not args.peer_ip:
-                wrapper._print_error("--peer-ip is required when using --orin-ip")
-                return 1
+                wrapper._print_error("--peer-ip is required when using --host-ip")
+                return EXIT_ORIN_FAILED
+            
+            # The ready poll already saw the device up; only pad the blind wait
+            if not peer_ready:
+                wrapper._print_info("Waiting 3 seconds before triggering Orin...")
+                time.sleep(3)
             
-            wrapper._print_info("Waiting 3 seconds before triggering Orin...")
-            time.sleep(3)
+            # One authenticated session shared by verify, copy and delete
+            wrapper.open_orin_session(args.orin_ip)
             
             # Trigger Docker verification on Orin
             orin_success = wrapper.trigger_orin_docker_verify(
@@ -595,36 +982,33 @@ def main() -> Tuple[bool, bool, bool]:
             
             if not orin_success:
                 wrapper._print_error("Orin verification failed!")
-                return 1
-        
-        if args.orin_ip and orin_success:
+                return EXIT_ORIN_FAILED
+            
             wrapper._print_info("Retrieving captured images from Orin...")
             time.sleep(2)  # Give filesystem time to flush
                 
-            tmp_file = os.path.join(Path.cwd().parent, "results", "temp.txt")
+            tmp_file = Path.cwd().parent / "results" / "temp.txt"
             
-            if os.path.exists(tmp_file):
-                 with open(tmp_file, "r") as f:
-                    res_dir = f.read()
-                    print(f"Results directory: {res_dir}")
+            # One read and one stat; res_dir stays None if either is missing
+            res_dir = None
+            try:
+                res_dir = os.path.expanduser(tmp_file.read_text().strip())
+                print(f"Results directory: {res_dir}")
+                if not stat.S_ISDIR(os.stat(res_dir).st_mode):
+                    raise NotADirectoryError(res_dir)
+            except (FileNotFoundError, NotADirectoryError) as e:
+                logging.error("Directory does NOT exist: %s", e)
+                res_dir = None
                       
-            if os.path.isdir(res_dir):
-                copy_success = wrapper.copy_images_from_orin(
-                orin_ip=args.orin_ip,
-                remote_dir="/home/lattice/HSB/CI_CD",  # Where verify_camera_imx258.py saves images
-                local_dir=os.path.expanduser(res_dir),  # Or your preferred path
-                timeout=60
+            if res_dir:
+                copy_success, del_success = wrapper.transfer_and_clear_from_orin(
+                    orin_ip=args.orin_ip,
+                    remote_dir="/home/lattice/HSB/CI_CD",  # Where verify_camera_imx258.py saves images
+                    local_dir=res_dir,  # Or your preferred path
+                    timeout=60
                 )
                 
                 if copy_success:
-                    
-                    del_success = wrapper.del_images_from_orin(
-                        orin_ip=args.orin_ip,
-                        remote_dir="/home/lattice/HSB/CI_CD",  # Where verify_camera_imx258.py saves images
-                        local_dir=os.path.expanduser(res_dir),  # Or your preferred path
-                        timeout=60
-                    )
-
                     if del_success:
                         wrapper._print_success("Captured images retrieved and deleted from Orin successfully")
                     else:
@@ -632,10 +1016,8 @@ def main() -> Tuple[bool, bool, bool]:
                 else:
                     wrapper._print_warning("Could not retrieve images, but verification passed")
 
-            else:
-                logging.error(f"Directory does NOT exist")
-
-            os.remove(tmp_file)
+            tmp_file.unlink(missing_ok=True)
+            wrapper.close_orin_sessions()
 
         # Success!
         wrapper._print_header("Complete Workflow Status")
@@ -646,17 +1028,21 @@ def main() -> Tuple[bool, bool, bool]:
 
         tpf.print_end()
         
-        return program_success, powercycle_ok, orin_success
+        return EXIT_OK
     
     except KeyboardInterrupt:
         print("\n\nInterrupted by user (Ctrl+C)")
-        return 0
+        return EXIT_INTERRUPTED
     except Exception as e:
         print(f"\n[✗] {e}")
         if args.verbose:
             import traceback
             traceback.print_exc()
-        return False, False
+        return EXIT_FPGA_FAILED
+    finally:
+        # Early returns and errors must not leave ControlPersist masters behind
+        if wrapper is not None:
+            wrapper.close_orin_sessions()
 
 
 if __name__ == "__main__":
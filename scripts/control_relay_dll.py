@@ -60,10 +60,14 @@ _relay_lib = None
 _device_handle = None
 _device_info = None
 
+# Channel toggle functions, bound once the library is loaded
+_open_ch = None
+_close_ch = None
+
 
 def _load_library():
     """Load the USB relay library (lazy loading)."""
-    global _relay_lib
+    global _relay_lib, _open_ch, _close_ch
     
     if _relay_lib is not None:
         return _relay_lib
@@ -118,6 +122,9 @@ def _load_library():
     _relay_lib.usb_relay_device_close_all_relay_channel.argtypes = [c_void_p]
     _relay_lib.usb_relay_device_close_all_relay_channel.restype = c_int
     
+    _open_ch = _relay_lib.usb_relay_device_open_one_relay_channel
+    _close_ch = _relay_lib.usb_relay_device_close_one_relay_channel
+    
     return _relay_lib
 
 # ============================================================================
@@ -171,9 +178,7 @@ def relay_xon(relay):
     if _device_handle is None:
         raise RuntimeError("Relay not initialized. Call initialize() first.")
     
-    relay_lib = _load_library()
-    result = relay_lib.usb_relay_device_open_one_relay_channel(_device_handle, relay)
-    return result == 0
+    return _open_ch(_device_handle, relay) == 0
 
 
 def relay_xoff(relay):
@@ -189,9 +194,7 @@ def relay_xoff(relay):
     if _device_handle is None:
         raise RuntimeError("Relay not initialized. Call initialize() first.")
     
-    relay_lib = _load_library()
-    result = relay_lib.usb_relay_device_close_one_relay_channel(_device_handle, relay)
-    return result == 0
+    return _close_ch(_device_handle, relay) == 0
 
 
 def relay_NC_power_cycle(relay, delay=3):
@@ -207,10 +210,9 @@ def relay_NC_power_cycle(relay, delay=3):
     if _device_handle is None:
         raise RuntimeError("Relay not initialized. Call initialize() first.")
     
-    relay_lib = _load_library()
-    on_result = relay_lib.usb_relay_device_open_one_relay_channel(_device_handle, relay)
+    on_result = _open_ch(_device_handle, relay)
     time.sleep(delay)  # Short delay to ensure power cycle
-    off_result = relay_lib.usb_relay_device_close_one_relay_channel(_device_handle, relay)
+    off_result = _close_ch(_device_handle, relay)
     return off_result == 0 and on_result == 0
 
 
@@ -227,10 +229,9 @@ def relay_NO_power_cycle(relay, delay=3):
     if _device_handle is None:
         raise RuntimeError("Relay not initialized. Call initialize() first.")
     
-    relay_lib = _load_library()
-    off_result = relay_lib.usb_relay_device_close_one_relay_channel(_device_handle, relay)
+    off_result = _close_ch(_device_handle, relay)
     time.sleep(delay)  # Short delay to ensure power cycle
-    on_result = relay_lib.usb_relay_device_open_one_relay_channel(_device_handle, relay)
+    on_result = _open_ch(_device_handle, relay)
     return off_result == 0 and on_result == 0
 
 def cleanup():
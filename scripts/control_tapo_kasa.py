@@ -1,97 +1,201 @@
 import argparse
 import asyncio
+import json
 import os
 import sys
-from typing import Optional
-from kasa import Discover, Credentials
+import time
+from enum import Enum
+from pathlib import Path
+from typing import List, Optional, Union
+from kasa import Device, DeviceConfig, Discover, Credentials
 
-async def run_device(ip: str, email: str, password: str, plug_index: Optional[int] = None, toggle_on: Optional[int] = None, toggle_off :  Optional[int] = None, list_only: bool = False, check_children: bool = False):
+try:
+    import uvloop  # libuv event loop, not available on Windows
+except ImportError:
+    uvloop = None
 
-    dev = await Discover.discover_single(ip, credentials=Credentials(email, password))
+DEFAULT_IP = "192.168.1.136"
+DEFAULT_EMAIL = "ZhengYan.Wong@latticesemi.com"
+DEFAULT_PASSWORD = "password@lattice"
+
+# Connection parameters (protocol/encryption type) per device IP, so later runs can
+# connect directly instead of repeating discovery
+SESSION_CACHE = Path.home() / ".cache" / "hsb" / "tapo_session.json"
+SESSION_TTL_S = 24 * 60 * 60
+
+
+class Action(Enum):
+    """What one invocation does, decided once from the command line."""
+    STATE = "state"  # show one plug's state
+    LIST = "list"    # list every plug
+    ON = "on"
+    OFF = "off"
+    COUNT = "count"  # only count the plugs
+
+
+def _load_session_cache() -> dict:
+    try:
+        return json.loads(SESSION_CACHE.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_session_config(ip: str, dev) -> None:
+    try:
+        try:
+            config = dev.config.to_dict(exclude_credentials=True)
+        except TypeError:
+            config = dev.config.to_dict()
+            config.pop("credentials", None)
+        cache = _load_session_cache()
+        cache[ip] = {"config": config, "expires_at": time.time() + SESSION_TTL_S}
+        SESSION_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        SESSION_CACHE.write_text(json.dumps(cache, indent=2))
+    except Exception:
+        pass  # Cache is only an optimization
+
+
+def _save_plug_count(ip: str, count: int) -> None:
+    # Remembered so usage errors can report the valid range without a network round trip
+    try:
+        cache = _load_session_cache()
+        if ip in cache and cache[ip].get("plug_count") != count:
+            cache[ip]["plug_count"] = count
+            SESSION_CACHE.write_text(json.dumps(cache, indent=2))
+    except Exception:
+        pass  # Cache is only an optimization
+
+
+def _run(coro):
+    """asyncio.run on uvloop when it is installed (Python 3.11+), default loop otherwise."""
+    if uvloop is not None and sys.version_info >= (3, 11):
+        return asyncio.run(coro, loop_factory=uvloop.new_event_loop)
+    return asyncio.run(coro)
+
+
+async def connect_device(ip: str, email: str, password: str):
+    credentials = Credentials(email, password)
+    entry = _load_session_cache().get(ip)
+    if entry and entry.get("expires_at", 0) > time.time() + 5:
+        try:
+            config = DeviceConfig.from_dict(entry["config"])
+            config.credentials = credentials
+            return await Device.connect(config=config)
+        except Exception:
+            pass  # Stale or incompatible cache entry, rediscover below
+
+    dev = await Discover.discover_single(ip, credentials=credentials)
+    _save_session_config(ip, dev)
+    return dev
+
+async def run_device(ip: str, email: str, password: str, action: Action, plug_index: Optional[int] = None, plugs: Optional[List[int]] = None):
+
+    dev = await connect_device(ip, email, password)
     try:
         await dev.update()
         print(dev)
 
-        # List plugs (children) if this is a strip
+        # Plugs (children) of the strip; child state comes with the parent update above
         children = getattr(dev, "children", None) or []
         plug_cnt = len(children) + 1  # Including main device as plug 1
-        if check_children:
-            return len(children)
-
-        if plug_cnt:
-            if not toggle_on and not toggle_off and list_only is False:
-                # Just show the state of the specified plug
-                if plug_index is not None:
-                    if plug_index < 0 or plug_index >= plug_cnt:
-                        print(f"Error: plug index {plug_index} is out of range (1 to {plug_cnt-1})")
-                        sys.exit(1)
-                else:
-                    print(f"Error: plug index 0 is out of range (1 to {plug_cnt-1})")
-                    sys.exit(1)
-                plug = children[plug_index-1]
-                await plug.update()
-                return print(f"Plug {plug_index}: alias={plug.alias} is {'on' if plug.is_on else 'off'}")
+        _save_plug_count(ip, len(children))
 
-            if not toggle_on and not toggle_off and list_only:
+        match action:
+            case Action.COUNT:
+                return len(children)
+            case Action.LIST:
                 print(f"Plug count: {plug_cnt-1}")
                 for idx, plug in enumerate(children):
-                    # Refresh individual plug state and print details
-                    await plug.update()
                     print(f"[{idx+1}] alias={plug.alias} is_on={plug.is_on}")
-
-            if toggle_on:
-                # Optionally toggle a specific plug
-                await toggle_plug(plug_cnt, children, toggle_on=toggle_on)
-            elif toggle_off:
-                await toggle_plug(plug_cnt, children, toggle_off=toggle_off)
+            case Action.STATE:
+                index = plug_index or 0
+                if index < 1 or index >= plug_cnt:
+                    print(f"Error: plug index {index} is out of range (1 to {plug_cnt-1})")
+                    sys.exit(1)
+                plug = children[index-1]
+                print(f"Plug {index}: alias={plug.alias} is {'on' if plug.is_on else 'off'}")
+            case Action.ON:
+                await toggle_plug(plug_cnt, children, toggle_on=plugs)
+            case Action.OFF:
+                await toggle_plug(plug_cnt, children, toggle_off=plugs)
     finally:
         # Close underlying HTTP session to avoid aiohttp warnings
         if hasattr(dev, "protocol") and hasattr(dev.protocol, "close"):
             await dev.protocol.close()
    
 
-async def toggle_plug(plug_cnt: int, children, toggle_on:  Optional[int] = None, toggle_off:  Optional[int] = None):
-    
-    if toggle_on is not None:
-        if toggle_on < 0 or toggle_on >= plug_cnt:
-            print(f"Error: plug index {toggle_on} is out of range (1 to {plug_cnt-1})")
-            sys.exit(1)
-        plug = children[toggle_on-1]
-        await plug.update()
-        if toggle_on:
-            if not plug.is_on:
-                await plug.turn_on()
-                print(f"Plug {toggle_on} turned on")
-            else:
-                print(f"Plug {toggle_on} is already on")
-    elif toggle_off is not None:
-        if toggle_off < 0 or toggle_off >= plug_cnt:
-            print(f"Error: plug index {toggle_off} is out of range (1 to {plug_cnt-1})")
-            sys.exit(1)
-        plug = children[toggle_off-1]
-        await plug.update()
-        if toggle_off:
-            if plug.is_on:
-                await plug.turn_off()
-                print(f"Plug {toggle_off} turned off")
-            else:
-                print(f"Plug {toggle_off} is already off")
-    else:
+async def toggle_plug(plug_cnt: int, children, toggle_on: Union[int, List[int], None] = None, toggle_off: Union[int, List[int], None] = None):
+    # Accepts one plug index or a list; several plugs are switched concurrently
+    indices = toggle_on if toggle_on is not None else toggle_off
+    if isinstance(indices, int):
+        indices = [indices]
+    if not indices:
         print(f"Error: plug index 0 is out of range (1 to {plug_cnt-1})")
         sys.exit(1)
+    for index in indices:
+        if index < 1 or index >= plug_cnt:
+            print(f"Error: plug index {index} is out of range (1 to {plug_cnt-1})")
+            sys.exit(1)
+
+    turn_on = toggle_on is not None
+    state = "on" if turn_on else "off"
+
+    async def set_plug(index: int):
+        plug = children[index-1]
+        if plug.is_on == turn_on:
+            print(f"Plug {index} is already {state}")
+            return
+        await (plug.turn_on() if turn_on else plug.turn_off())
+        print(f"Plug {index} turned {state}")
+
+    await asyncio.gather(*(set_plug(index) for index in indices))
         
+
+async def cycle_plug(ip: str, email: str, password: str, plug_index: int, off_s: float = 3.0):
+    # Power cycle one plug over a single device session (one discovery/login for off and on)
+    dev = await connect_device(ip, email, password)
+    try:
+        await dev.update()
+        children = getattr(dev, "children", None) or []
+        plug_cnt = len(children) + 1
+        if plug_index < 1 or plug_index >= plug_cnt:
+            print(f"Error: plug index {plug_index} is out of range (1 to {plug_cnt-1})")
+            sys.exit(1)
+        plug = children[plug_index-1]
+        await plug.turn_off()
+        print(f"Plug {plug_index} turned off")
+        await asyncio.sleep(off_s)
+        await plug.turn_on()
+        print(f"Plug {plug_index} turned on")
+    finally:
+        if hasattr(dev, "protocol") and hasattr(dev.protocol, "close"):
+            await dev.protocol.close()
+
+
+def cycle(plug_index: int, off_s: float = 3.0, ip: str = DEFAULT_IP, email: str = DEFAULT_EMAIL, password: str = DEFAULT_PASSWORD) -> None:
+    """Turn a plug off, wait off_s seconds, and turn it back on."""
+    _run(cycle_plug(ip, email, password, plug_index, off_s))
+
     
+def _plug_list(value: str) -> List[int]:
+    """Parse "4" or "1,3,5" into a list of plug indexes."""
+    try:
+        return [int(part) for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid plug list: {value!r}")
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Toggle or inspect Tapo/Kasa power strip plugs")
     # parser.add_argument("--ip", help="Device IP (TAPO_IP)")
     # parser.add_argument("--email", help="Account email (TAPO_EMAIL)")
     # parser.add_argument("--password", help="Account password (TAPO_PASSWORD)")
-    parser.add_argument("--ip", help="Device IP (TAPO_IP)", default="192.168.1.136")
-    parser.add_argument("--email", help="Account email (TAPO_EMAIL)", default="ZhengYan.Wong@latticesemi.com")
-    parser.add_argument("--password", help="Account password (TAPO_PASSWORD)", default="password@lattice")
+    parser.add_argument("--ip", help="Device IP (TAPO_IP)", default=DEFAULT_IP)
+    parser.add_argument("--email", help="Account email (TAPO_EMAIL)", default=DEFAULT_EMAIL)
+    parser.add_argument("--password", help="Account password (TAPO_PASSWORD)", default=DEFAULT_PASSWORD)
     parser.add_argument("--plug", type=int, default=None, help="Plug index to act on")
-    parser.add_argument("--toggle_on", type=int, default=None, help="Turn on the specified plug")
-    parser.add_argument("--toggle_off", type=int, default=None, help="Turn off the specified plug")
+    parser.add_argument("--toggle_on", type=_plug_list, default=None, help="Turn on the specified plug(s), e.g. 4 or 1,3,5")
+    parser.add_argument("--toggle_off", type=_plug_list, default=None, help="Turn off the specified plug(s), e.g. 4 or 1,3,5")
     parser.add_argument("--list", action="store_true", help="List device and plug information")
     parser.add_argument("--plug-state", type=int, default=None, help="Show the state of the specified plug")
     return parser.parse_args()
@@ -117,18 +221,26 @@ def main() -> None:
     #     args.plug_state -=1 # Convert to 0-based index    
 
     if args.list:
-        # Just list device and plug info
-        asyncio.run(run_device(ip, email, password, list_only=True))
+        action = Action.LIST
     elif args.plug_state:
-        # Just show the state of the specified plug
-        asyncio.run(run_device(ip, email, password, args.plug_state))
-    elif args.toggle_on or args.toggle_off:
-        # Toggle the specified plug
-        asyncio.run(run_device(ip, email, password, toggle_on=args.toggle_on, toggle_off=args.toggle_off))
-    elif args.toggle_on is None or args.toggle_off is None:
-        print(f"Error: plug index 0 is out of range (1 to {asyncio.run(run_device(ip, email, password, check_children=True))})")
+        action = Action.STATE
+    elif args.toggle_on:
+        action = Action.ON
+    elif args.toggle_off:
+        action = Action.OFF
     else:
-        print("No action specified. Use --list, --plug_state, --toggle_on, or --toggle_off.")
+        action = Action.COUNT
+
+    if action is Action.COUNT:
+        # No plug given: report the valid range, from the cache when possible
+        plug_count = _load_session_cache().get(ip, {}).get("plug_count")
+        if plug_count is None:
+            plug_count = _run(run_device(ip, email, password, Action.COUNT))
+        print(f"Error: plug index 0 is out of range (1 to {plug_count})")
+        return
+
+    plugs = args.toggle_on if action is Action.ON else args.toggle_off
+    _run(run_device(ip, email, password, action, plug_index=args.plug_state, plugs=plugs))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
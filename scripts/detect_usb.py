@@ -1,4 +1,6 @@
 # file: watch_usb_wmi.py
+import queue
+import threading
 import time
 import re
 import sys
@@ -14,70 +16,123 @@ GUID_DEVCLASS_PORTS = "{4d36e978-e325-11ce-bfc1-08002be10318}"
 # FTDI USB vendor ID
 FTDI_VID = "VID_0403"
 
+# Class GUIDs normalized once at import; WMI reports ClassGuid in either case
+_HID_GUID_U = GUID_DEVCLASS_HIDCLASS.upper()
+_PORTS_GUID_U = GUID_DEVCLASS_PORTS.upper()
+# Win32_PnPEntity properties read per event, in unpacking order
+EVENT_FIELDS = ("Name", "PNPDeviceID", "ClassGuid", "Manufacturer", "Description")
+# How long one watcher() call blocks waiting for an event before messages are pumped
+WATCH_TIMEOUT_MS = 500
+# Device storms (docks, composite devices) are reported as one batch once events
+# pause for DEBOUNCE_S, or after DEBOUNCE_MAX_S at the latest
+DEBOUNCE_S = 0.01
+DEBOUNCE_MAX_S = 0.1
+
+# Name heuristics, matched case-insensitively in one pass each
+_FTDI_NAME_RE = re.compile(r"usb serial port|usb serial converter|ftdi", re.IGNORECASE)
+_HID_NAME_RE = re.compile(r"hid-compliant|usb input device", re.IGNORECASE)
+
+# ClassGuid (uppercased) -> classification
+_CLASS_MAP = {
+    _HID_GUID_U: "HID (HID class GUID)",
+    # Ports class could still be Prolific/Silabs/etc., not only FTDI
+    _PORTS_GUID_U: "Serial (Ports class) – could be FTDI/Prolific/SiLabs; check VID/PID",
+}
+
 # Simple heuristics to classify HID vs FTDI from WMI properties
 def classify_device(pnp_device_id: str, class_guid: str, name: str) -> str:
-    name_l = (name or "").lower()
-    pnp_l = (pnp_device_id or "").upper()
-    class_l = (class_guid or "").upper()
+    name = name or ""
 
     # FTDI heuristics
-    if FTDI_VID in pnp_l:
+    if FTDI_VID in (pnp_device_id or "").upper():
         return "FTDI (VID_0403 detected)"
-    if "usb serial port" in name_l or "usb serial converter" in name_l or "ftdi" in name_l:
+    if _FTDI_NAME_RE.search(name):
         return "Likely FTDI (USB-Serial)"
 
-    # HID heuristics
-    if class_l == GUID_DEVCLASS_HIDCLASS.upper():
-        return "HID (HID class GUID)"
-    if "hid-compliant" in name_l or "usb input device" in name_l:
+    # HID heuristics, then the Ports class
+    class_u = (class_guid or "").upper()
+    by_class = _CLASS_MAP.get(class_u)
+    if class_u == _HID_GUID_U:
+        return by_class
+    if _HID_NAME_RE.search(name):
         return "Likely HID"
-
-    # Ports class could still be Prolific/Silabs/etc., not only FTDI
-    if class_l == GUID_DEVCLASS_PORTS.upper():
-        return "Serial (Ports class) – could be FTDI/Prolific/SiLabs; check VID/PID"
+    if by_class is not None:
+        return by_class
 
     return "Unknown (inspect VID/PID and ClassGuid)"
 
+def watch_events(events: queue.Queue) -> None:
+    """
+    Watcher thread: owns its COM apartment and WMI connection and pushes the
+    EVENT_FIELDS tuple of every new PnP entity onto events.
+    """
+    pythoncom.CoInitialize()
+    try:
+        # We watch for any new PnP entity; you can restrict to USB if desired
+        c = wmi.WMI()
+
+        # This event fires when a new PnP entity is created.
+        # Win32_PnPEntity has useful fields: Name, PNPDeviceID, ClassGuid, Manufacturer, etc.
+        # Only TargetInstance is selected from the event (no SECURITY_DESCRIPTOR/TIME_CREATED)
+        watcher = c.watch_for(
+            notification_type="Creation",
+            wmi_class="Win32_PnPEntity",
+            fields=["TargetInstance"]
+        )
+
+        while True:
+            try:
+                evt = watcher(timeout_ms=WATCH_TIMEOUT_MS)  # blocks until a device appears
+                # Read straight from the SWbemObject, skipping the wmi wrapper's per-attribute lookups
+                props = evt.ole_object.Properties_
+                events.put(tuple(props(field).Value for field in EVENT_FIELDS))
+            except wmi.x_wmi_timed_out:
+                # Idle: service the COM apartment, then go back to waiting
+                pythoncom.PumpWaitingMessages()
+            except Exception as e:
+                # Transient errors can happen during device churn; continue watching
+                print(f"[warn] Event error: {e}")
+                time.sleep(1)
+    finally:
+        pythoncom.CoUninitialize()
+
+def report_device(name, pnpid, class_guid, mfg, desc) -> None:
+    kind = classify_device(pnpid, class_guid, name)
+
+    print("\n=== New PnP Device Detected ===")
+    print(f"Name        : {name}")
+    print(f"Description : {desc}")
+    print(f"Manufacturer: {mfg}")
+    print(f"ClassGuid   : {class_guid}")
+    print(f"PNPDeviceID : {pnpid}")
+    print(f"Classification → {kind}")
+    print("Hint: In Device Manager, check Details → Hardware Ids for VID/PID.\n")
+
 def main():
     print("Watching for newly added USB PnP devices… (Ctrl+C to stop)")
-    # We watch for any new PnP entity; you can restrict to USB if desired
-    c = wmi.WMI()
-
-    # This event fires when a new PnP entity is created.
-    # Win32_PnPEntity has useful fields: Name, PNPDeviceID, ClassGuid, Manufacturer, etc.
-    watcher = c.watch_for(
-        notification_type="Creation",
-        wmi_class="Win32_PnPEntity"
-    )
-
-    while True:
-        pythoncom.PumpWaitingMessages()
-        try:
-            evt = watcher()  # blocks until a device appears
-            name = getattr(evt, "Name", None)
-            pnpid = getattr(evt, "PNPDeviceID", None)
-            class_guid = getattr(evt, "ClassGuid", None)
-            mfg = getattr(evt, "Manufacturer", None)
-            desc = getattr(evt, "Description", None)
-
-            kind = classify_device(pnpid, class_guid, name)
-
-            print("\n=== New PnP Device Detected ===")
-            print(f"Name        : {name}")
-            print(f"Description : {desc}")
-            print(f"Manufacturer: {mfg}")
-            print(f"ClassGuid   : {class_guid}")
-            print(f"PNPDeviceID : {pnpid}")
-            print(f"Classification → {kind}")
-            print("Hint: In Device Manager, check Details → Hardware Ids for VID/PID.\n")
-
-        except KeyboardInterrupt:
-            print("\nStopping watcher.")
-            sys.exit(0)
-        except Exception as e:
-            # Transient errors can happen during device churn; continue watching
-            print(f"[warn] Event error: {e}")
-            time.sleep(1)
+    # WMI blocks in its own thread; the main thread only waits on the queue with a
+    # timeout, so Ctrl+C is handled promptly
+    events = queue.Queue()
+    threading.Thread(target=watch_events, args=(events,), daemon=True).start()
+
+    try:
+        while True:
+            try:
+                burst = [events.get(timeout=WATCH_TIMEOUT_MS / 1000)]
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + DEBOUNCE_MAX_S
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    burst.append(events.get(timeout=min(DEBOUNCE_S, remaining)))
+                except queue.Empty:
+                    break
+            # One report per device even if the storm repeated it (keyed by PNPDeviceID)
+            for fields in {fields[1]: fields for fields in burst}.values():
+                report_device(*fields)
+    except KeyboardInterrupt:
+        print("\nStopping watcher.")
+        sys.exit(0)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
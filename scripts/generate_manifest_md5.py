@@ -23,14 +23,22 @@
 import argparse
 import datetime
 import hashlib
+import json
 import os
 import requests
-import urllib.parse
+import threading
 import yaml
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from read_metadata import search_metadata_value
 
+# LibYAML-backed emitter when PyYAML was built with it
+try:
+    from yaml import CSafeDumper as ManifestDumper
+except ImportError:
+    from yaml import SafeDumper as ManifestDumper
+
 def find_ci_cd_dir():
     """
     Dynamically find the CI_CD directory.
@@ -56,52 +64,201 @@ def find_ci_cd_dir():
     # Return first fallback path even if it doesn't exist
     return fallback_paths[0]
 
+DEFAULT_EULA_FILE = str(find_ci_cd_dir() / "EULA" / "NVIDIA_RTL_License_Agreement.txt")
+
+# Read/download granularity for hashing; bit files are never held in memory whole
+CHUNK_SIZE = 1 << 20
+# Local files are read in larger pieces, the kernel being told to read ahead
+FILE_READ_SIZE = 4 << 20
+
+# One keep-alive connection pool for every URL fetched (bit files usually share a host)
+_SESSION = requests.Session()
+_SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=4))
+_SESSION.mount("https://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
+def is_sha256(checksum) -> bool:
+    """An expected checksum of 64 hex digits is SHA-256; anything else is taken as MD5."""
+    return checksum is not None and len(checksum) == 64
+
+def hash_chunks(chunks, sha256=False):
+    """
+    (md5_hex, size, sha256_hex) of an iterable of byte chunks. The manifest
+    format carries MD5, so SHA-256 (hardware accelerated in OpenSSL) is only
+    computed, from the same pass, when an expected SHA-256 is to be checked.
+    """
+    md5 = hashlib.md5(usedforsecurity=False)  # integrity check, not security
+    sha = hashlib.sha256() if sha256 else None
+    size = 0
+    for chunk in chunks:
+        md5.update(chunk)
+        if sha is not None:
+            sha.update(chunk)
+        size += len(chunk)
+    return md5.hexdigest(), size, sha.hexdigest() if sha is not None else None
+
+# Digest sidecar: {abs_path: [mtime_ns, size, md5_hex, sha256_hex or None]}, so
+# unchanged bit files are not re-read by every CI job that validates them
+DIGEST_CACHE = Path.home() / ".cache" / "hsb" / "md5_cache.json"
+_digest_cache = None
+_digest_cache_dirty = False
+_digest_cache_lock = threading.Lock()
+
+def _cached_digest(path, st, sha256=False):
+    """hash_chunks() tuple for path if its mtime and size still match the sidecar, else None."""
+    global _digest_cache
+    with _digest_cache_lock:
+        if _digest_cache is None:
+            try:
+                _digest_cache = json.loads(DIGEST_CACHE.read_text())
+            except (OSError, ValueError):
+                _digest_cache = {}
+        entry = _digest_cache.get(path)
+    if not entry or entry[0] != st.st_mtime_ns or entry[1] != st.st_size:
+        return None
+    if sha256 and entry[3] is None:
+        return None
+    return entry[2], entry[1], entry[3]
+
+def _store_digest(path, st, content):
+    global _digest_cache_dirty
+    md5_hex, size, sha256_hex = content
+    with _digest_cache_lock:
+        if sha256_hex is None and path in _digest_cache and _digest_cache[path][:3] == [st.st_mtime_ns, size, md5_hex]:
+            sha256_hex = _digest_cache[path][3]
+        _digest_cache[path] = [st.st_mtime_ns, size, md5_hex, sha256_hex]
+        _digest_cache_dirty = True
+
+def save_digest_cache():
+    """Write the sidecar back if any digest was added."""
+    global _digest_cache_dirty
+    with _digest_cache_lock:
+        if not _digest_cache_dirty:
+            return
+        try:
+            DIGEST_CACHE.parent.mkdir(parents=True, exist_ok=True)
+            DIGEST_CACHE.write_text(json.dumps(_digest_cache, indent=2))
+            _digest_cache_dirty = False
+        except OSError:
+            pass  # Cache is only an optimization
+
+def read_chunks(filename):
+    """Yield a file's contents in FILE_READ_SIZE pieces, reusing one buffer."""
+    buf = bytearray(FILE_READ_SIZE)
+    view = memoryview(buf)
+    with open(filename, "rb", buffering=0) as f:
+        # Sequential access: widen read-ahead and start it now (POSIX only;
+        # the advice values are distinct, not flags, so each is given separately)
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+        while n := f.readinto(buf):
+            yield view[:n]
+
 def measure(metadata, content, md5_check=None) -> bool:
-    md5 = hashlib.md5(content)
+    """
+    Record size and md5 in metadata; content is either the raw bytes or an
+    already computed tuple from hash_chunks(). md5_check may be an MD5 or a
+    SHA-256 hex digest.
+    """
+    if not isinstance(content, tuple):
+        content = hash_chunks((content,), sha256=is_sha256(md5_check))
+    md5_hex, size, sha256_hex = content
     metadata.update({
-        "size": len(content),
-        "md5": md5.hexdigest(),
+        "size": size,
+        "md5": md5_hex,
     })
     if md5_check is not None:
-        if md5_check != md5.hexdigest():
-            raise Exception(f"MD5 checksum mismatch: expected {md5_check}, got {md5.hexdigest()}")
+        algorithm, actual = ("SHA-256", sha256_hex) if is_sha256(md5_check) else ("MD5", md5_hex)
+        if md5_check != actual:
+            raise Exception(f"{algorithm} checksum mismatch: expected {md5_check}, got {actual}")
             
         else:
-            print(f"Bitstream MD5 checksum verified: {md5.hexdigest()}")
+            print(f"Bitstream {algorithm} checksum verified: {actual}")
             return True
 
-def fetch_url(url):
-    # Given a url, extract just the filename
-    p = urllib.parse.urlparse(url)
-    image = p.path.split("/")[-1]
-    # Fetch the content
-    request = requests.get(
+def fetch_url(url, sha256=False):
+    # Given a url, extract just the filename (last path segment, without query/fragment)
+    image = url.partition("#")[0].partition("?")[0].rpartition("/")[2]
+    # Fetch the content, hashing it as it streams in
+    with _SESSION.get(
         url,
         headers={
             "Content-Type": "binary/octet-stream",
         },
-    )
-    if request.status_code != requests.codes.ok:
-        raise Exception(
-            f'Unable to fetch "{url}"; status={request.status_code}'
-        )
-    content = request.content
+        stream=True,
+    ) as request:
+        if request.status_code != requests.codes.ok:
+            raise Exception(
+                f'Unable to fetch "{url}"; status={request.status_code}'
+            )
+        content = hash_chunks(request.iter_content(CHUNK_SIZE), sha256)
     # build a metadata
     metadata = {
         "url": url,
     }
     return image, metadata, content
 
-def fetch_file(filename):
-    p = os.path.split(filename)
-    image = p[-1]
-    with open(filename, "rb") as f:
-        content = f.read()
+def fetch_file(filename, sha256=False):
+    image = filename.rpartition(os.sep)[2]
+    # Stat before hashing, so a file modified mid-read is never cached as unchanged
+    path = os.path.abspath(filename)
+    st = os.stat(path)
+    content = _cached_digest(path, st, sha256)
+    if content is None:
+        content = hash_chunks(read_chunks(filename), sha256)
+        _store_digest(path, st, content)
     metadata = {
         "filename": filename,
     }
     return image, metadata, content
 
+# Used to check that a plain (unquoted) key would be read back as that same string
+_YAML_RESOLVER = yaml.resolver.Resolver()
+_YAML_STR_TAG = "tag:yaml.org,2002:str"
+
+def _yaml_key(key) -> str:
+    """Mapping key as written by dump_manifest: plain when that reads back as the same string, JSON-quoted otherwise."""
+    key = str(key)
+    plain = (
+        key
+        and key[0] != "-"
+        and key.replace("_", "").replace("-", "").replace(".", "").isalnum()
+        # "2510", "1.0", "yes", "on", "null"... would load as int/float/bool/None
+        and _YAML_RESOLVER.resolve(yaml.ScalarNode, key, (True, False)) == _YAML_STR_TAG
+    )
+    return key if plain else json.dumps(key)
+
+def _dump_node(node, pad, lines):
+    """Append the block-style YAML lines for a dict or list, keys sorted as yaml.dump does."""
+    if isinstance(node, dict):
+        for key in sorted(node):
+            value = node[key]
+            if isinstance(value, (dict, list)) and value:
+                lines.append(f"{pad}{_yaml_key(key)}:")
+                # yaml.dump does not indent a sequence under its mapping key
+                _dump_node(value, pad + "  " if isinstance(value, dict) else pad, lines)
+            else:
+                lines.append(f"{pad}{_yaml_key(key)}: {json.dumps(value)}")
+        return
+    for item in node:
+        if isinstance(item, dict) and item:
+            start = len(lines)
+            _dump_node(item, pad + "  ", lines)
+            lines[start] = f"{pad}- " + lines[start][len(pad) + 2:]
+        else:
+            lines.append(f"{pad}- {json.dumps(item)}")
+
+def dump_manifest(mnfst, f):
+    """
+    Write the manifest as block YAML without going through PyYAML. The
+    schema is small and fixed (nested dicts/lists of str and int). Every
+    value is written JSON-quoted and keys are quoted unless they are plain
+    strings to YAML, so yaml.safe_load() gives back the same dict.
+    """
+    lines = []
+    _dump_node(mnfst, "", lines)
+    f.write("\n".join(lines) + "\n")
+
 
 def parse_args(args=None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
@@ -129,7 +286,7 @@ def parse_args(args=None) -> argparse.Namespace:
     )
     parser.add_argument(
         "--eula-file",
-        default=str(find_ci_cd_dir() / "EULA" / "NVIDIA_RTL_License_Agreement.txt"),
+        default=DEFAULT_EULA_FILE,
         help="EULA, fetched from a local file.",
     )
     parser.add_argument(
@@ -164,31 +321,43 @@ def parse_args(args=None) -> argparse.Namespace:
     parser.add_argument(
         "--md5",
         default=None,
-        help="MD5 checksum of the bitstream file to verify file integrity.",
+        help="MD5 (or SHA-256) checksum of the bitstream file to verify file integrity.",
+    )
+    parser.add_argument(
+        "--legacy-yaml",
+        action="store_true",
+        help="Write the manifest with yaml.dump instead of the built-in writer.",
     )
     return parser.parse_args(args)
 
 def main(argv=None) -> tuple[bool, bool]:
-    if argv is None:
-        args = parse_args()
-    else:
-        args = parse_args(argv)
+    return run(**vars(parse_args(argv)))
 
-    # ...
-    version = args.version
+def run(
+    version,
+    manifest="new_manifest.yaml",
+    cpnx_file=None,
+    clnx_file=None,
+    stratix_file=None,
+    eula_file=DEFAULT_EULA_FILE,
+    cpnx_url=None,
+    clnx_url=None,
+    stratix_url=None,
+    eula_url=None,
+    strategy=None,
+    fpga_uuid=None,
+    peer_ip=None,
+    md5=None,
+    legacy_yaml=False,
+) -> tuple[bool, bool]:
+    """
+    Write the manifest; same fields as the command line options, so callers
+    in the same process don't have to go through sys.argv and argparse.
+    fpga_uuid is a list, as built by the repeatable --fpga-uuid option.
+    """
     utc = datetime.timezone.utc
     now = datetime.datetime.now(utc)
-    cpnx_file = args.cpnx_file
-    clnx_file = args.clnx_file
-    stratix_file = args.stratix_file
-    eula_file = args.eula_file
-    cpnx_url = args.cpnx_url
-    clnx_url = args.clnx_url
-    stratix_url = args.stratix_url
-    eula_url = args.eula_url
-    fpga_uuid = args.fpga_uuid
-    peer_ip = args.peer_ip
-    md5_check = args.md5
+    md5_check = md5
     fpga_ok = False
     bitstream_ok = False
 
@@ -211,7 +380,6 @@ def main(argv=None) -> tuple[bool, bool]:
     if not any([cpnx_file, clnx_file, stratix_file, cpnx_url, clnx_url, stratix_url]):
         print("Exception thrown: At least one of --cpnx-file, --clnx-file, --stratix-file, --cpnx-url, --clnx-url, or --stratix-url must be specified.")
         raise SystemExit(2)
-    strategy = args.strategy
     if strategy is None:
         strategy = "sensor_bridge_10"
         if (stratix_file is not None) or (stratix_url is not None):
@@ -225,59 +393,51 @@ def main(argv=None) -> tuple[bool, bool]:
             "version": version,
             "enrollment_date": now.isoformat(),
         },
-        "content": {
-        },
         "strategy": strategy,
     }
-    images = [ ]
-    def measure_file(filename, context) -> bool:
-        image, metadata, content = fetch_file(filename)
-        bitstream_ok = measure(metadata, content, md5_check)
-        nonlocal hololink
-        hololink["content"][image] = metadata
-        nonlocal images
-        images.append({
-            "content": image,
-            "context": context,
-        })
-        return bitstream_ok
-    def measure_url(url, context) -> bool:
-        image, metadata, content = fetch_url(url)
-        bitstream_ok = measure(metadata, content, md5_check)
-        nonlocal hololink
-        hololink["content"][image] = metadata
-        nonlocal images
-        images.append({
-            "content": image,
-            "context": context,
-        })
-        return bitstream_ok
+    # (fetch, source, context) in manifest order; context None marks a EULA
+    sources = []
     if cpnx_file is not None:
-        bitstream_ok = measure_file(cpnx_file, "cpnx")
+        sources.append((fetch_file, cpnx_file, "cpnx"))
     if clnx_file is not None:
-        bitstream_ok = measure_file(clnx_file, "clnx")
+        sources.append((fetch_file, clnx_file, "clnx"))
     if stratix_file is not None:
-        measure_file(stratix_file, "stratix")
+        sources.append((fetch_file, stratix_file, "stratix"))
     if eula_file is not None:
-        image, metadata, content = fetch_file(eula_file)
-        measure(metadata, content)
-        hololink["content"][image] = metadata
-        licenses = hololink.setdefault("licenses", [])
-        licenses.append(image)
+        sources.append((fetch_file, eula_file, None))
     if cpnx_url is not None:
-        bitstream_ok = measure_url(cpnx_url, "cpnx")
+        sources.append((fetch_url, cpnx_url, "cpnx"))
     if clnx_url is not None:
-        bitstream_ok = measure_url(clnx_url, "clnx")
+        sources.append((fetch_url, clnx_url, "clnx"))
     if stratix_url is not None:
-        measure_url(stratix_url, "stratix")
+        sources.append((fetch_url, stratix_url, "stratix"))
     if eula_url is not None:
-        image, metadata, content = fetch_url(eula_url)
-        measure(metadata, content)
-        hololink["content"][image] = metadata
-        licenses = hololink.setdefault("licenses", [])
-        licenses.append(image)
+        sources.append((fetch_url, eula_url, None))
+    # Reads, downloads and hashing release the GIL, so fetch all inputs at once.
+    # The same file/URL given for several contexts is fetched and hashed only once.
+    keys = [(fetch, source, is_sha256(md5_check) and context is not None) for fetch, source, context in sources]
+    unique = list(dict.fromkeys(keys))
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = dict(zip(unique, executor.map(lambda key: key[0](key[1], sha256=key[2]), unique)))
+    save_digest_cache()
+    # content/images/licenses are built in one pass each, sized from sources
+    placed = [(context, results[key]) for (_, _, context), key in zip(sources, keys)]
+    hololink["content"] = {image: dict(metadata) for _, (image, metadata, _) in placed}  # measure() fills these in
+    for context, (image, _, content) in placed:
+        image_ok = measure(hololink["content"][image], content, md5_check if context is not None else None)
+        if context not in (None, "stratix"):
+            bitstream_ok = image_ok
+    licenses = [image for context, (image, _, _) in placed if context is None]
+    if licenses:
+        hololink["licenses"] = licenses
 
-    hololink["images"] = images
+    hololink["images"] = [
+        {
+            "content": image,
+            "context": context,
+        }
+        for context, (image, _, _) in placed if context is not None
+    ]
     hololink["fpga_uuid"] = fpga_uuid
     
     #Debug
@@ -287,8 +447,14 @@ def main(argv=None) -> tuple[bool, bool]:
     mnfst = {
         "hololink": hololink,
     }
-    with open(args.manifest, "wt") as f:
-        f.write(yaml.dump(mnfst, default_flow_style=False))
+    # Flushed to disk before returning, so callers can use it straight away
+    with open(manifest, "wt") as f:
+        if legacy_yaml:
+            yaml.dump(mnfst, f, Dumper=ManifestDumper, default_flow_style=False)
+        else:
+            dump_manifest(mnfst, f)
+        f.flush()
+        os.fsync(f.fileno())
 
     return fpga_ok, bitstream_ok
 
@@ -1,60 +1,6 @@
 import sys
 import argparse
 from hololink import Hololink, Enumerator, DataChannel, Timeout  # session/control entry
-# Delay importing sensor modules until after compatibility shims are installed
-
-def _patch_deserializer_endian_aliases():
-    """Map old Deserializer method names (next_u32_be) to new names (next_uint32_be)."""
-    try:
-        try:
-            from hololink.hololink_core import _hololink_core as core
-        except Exception:
-            import hololink.hololink_core._hololink_core as core
-
-        ds = getattr(core, "Deserializer", None)
-        if ds is None:
-            print("WARNING: Deserializer not found")
-            return
-
-        # Check for naming convention: new style uses "uint", old style uses "u"
-        has_new_style = hasattr(ds, "next_uint32_be")  # new: next_uint32_be
-        has_old_style = hasattr(ds, "next_u32_be")      # old: next_u32_be
-        
-        print(f"Naming check: new_style={has_new_style}, old_style={has_old_style}")
-        
-        # Only patch if we have new-style but not old-style (need compatibility layer)
-        if not (has_new_style and not has_old_style):
-            print("No naming translation needed")
-            return
-
-        print("Applying naming compatibility layer...")
-        original_ds = ds
-
-        # Try to add methods directly to the C++ class
-        try:
-            # Python can't modify C++ class methods directly, so we use setattr on instances
-            # Instead, we'll monkey-patch at the instance level via __getattribute__
-            
-            original_new = original_ds.__new__
-            
-            def patched_new(cls, *args, **kwargs):
-                instance = original_new(cls)
-                return instance
-            
-            # Actually, we can't do this for C++ classes...
-            # The REAL solution: patch it at import time in the sensor module
-            
-            print("ERROR: Cannot monkey-patch C++ extension classes directly")
-            print("The sensor module and core library are incompatible")
-            print("You need matching versions of both libraries")
-            return
-            
-        except Exception as e:
-            print(f"Failed to patch C++ class: {e}")
-        
-    except Exception as e:
-        print(f"WARNING: Failed to apply compatibility layer: {e}")
-
 
 # NOT USED TO TROUBLESHOOT VERSION MISMATCH ISSUES =========================================================================================================
 # def _core_has_be_methods() -> bool:
@@ -97,13 +43,26 @@ def _resolve_channel(hl: Hololink, camera_id: int):
     raise RuntimeError("Unable to obtain hololink channel; tried get/open/channels")
 
 
-def _clip_center(text: str, width: int) -> str:
-    if len(text) > width:
-        if width >= 3:
-            text = text[: width - 3] + "..."
-        else:
-            text = text[:width]
-    return text.center(width)
+# hololink.sensors.imx258 (C++ sensor bindings), loaded on first use so that
+# --help and metadata listing do not pay for it
+_IMX258 = None
+
+
+def _ensure_sensor_module():
+    global _IMX258
+    if _IMX258 is None:
+        from hololink.sensors import imx258
+        _IMX258 = imx258
+    return _IMX258
+
+
+def _maybe_clip(text: str, width: int) -> str:
+    # Only overlong cells need work; centering is left to the row format
+    if len(text) <= width:
+        return text
+    if width >= 3:
+        return text[: width - 3] + "..."
+    return text[:width]
 
 
 def print_metadata_table(serial_number: str, metadata: dict, width: int = 106):
@@ -122,19 +81,23 @@ def print_metadata_table(serial_number: str, metadata: dict, width: int = 106):
     # Two-column content widths (inside borders and center bar)
     left_w = (width - 3) // 2
     right_w = (width - 3) - left_w
+    # Row templates with the (loop-invariant) column widths filled in
+    single_fmt = "|{:^%d}|" % inner_full
+    row_fmt = "|{:^%d}|{:^%d}|" % (left_w, right_w)
+    # Lines are collected and written to stdout in one go
+    out: list[str] = []
 
     def _row_single(text: str):
-        print(sep)
-        print("|" + _clip_center(text, inner_full) + "|")
+        out.append(sep)
+        out.append(single_fmt.format(_maybe_clip(text, inner_full)))
 
     def _row_double(left: str, right: str):
-        print(sep)
-        print(
-            "|"
-            + _clip_center(left, left_w)
-            + "|"
-            + _clip_center(right, right_w)
-            + "|"
+        out.append(sep)
+        out.append(
+            row_fmt.format(
+                _maybe_clip(left, left_w),
+                _maybe_clip(right, right_w),
+            )
         )
 
     # Header rows
@@ -161,32 +124,19 @@ def print_metadata_table(serial_number: str, metadata: dict, width: int = 106):
 
     if not items:
         _row_double("<no metadata>", "")
-        print(sep)
-        return
-
-    # Emit in pairs
-    it = iter(items)
-    for left in it:
-        right = next(it, "")
-        _row_double(left, right)
+    else:
+        # Emit in pairs
+        it = iter(items)
+        for left in it:
+            right = next(it, "")
+            _row_double(left, right)
     # Final separator line
-    print(sep)
+    out.append(sep)
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 def main():
 
-    # Import sensor module FIRST (it caches the Deserializer reference)
-    print("Pre-loading sensor module...")
-    from hololink.sensors import imx258
-    
-    # Apply runtime compatibility shim for Deserializer `_be` methods
-    _patch_deserializer_endian_aliases()
-    
-    # Force reload the sensor module to pick up the patched Deserializer
-    import importlib
-    importlib.reload(imx258)
-    print("Sensor module reloaded with patched Deserializer")
-
     # ======================================================================================================================================================== 
     # Diagnostic: Verify the patch actually took effect, the patch may not work if the C++ sensor bindings are already compiled against an incompatible core
     # try:
@@ -252,8 +202,6 @@ def main():
     # =====================================================================================================================================================
 
     print("Reading metadata for device... ")
-    # Import imx258 only after shims so it picks up patched core APIs
-    from hololink.sensors import imx258
 
     parser = argparse.ArgumentParser(description="Read IMX258 timing registers (VTS/HTS/PLL)")
     parser.add_argument("--peer-ip", help="Hololink channel IP (if omitted, list devices and exit)")
@@ -299,11 +247,11 @@ def main():
                     except Exception:
                         pass
 
+                    imx258 = _ensure_sensor_module()
                     cam = imx258.Imx258(channel, args.camera_id)
 
                     # Configure camera before reading registers
-                    from hololink.sensors.imx258 import Imx258_Mode
-                    cam.configure(Imx258_Mode.IMX258_MODE_1920X1080_60FPS)
+                    cam.configure(imx258.Imx258_Mode.IMX258_MODE_1920X1080_60FPS)
 
                     def r8(a: int) -> int:
                         return cam.get_register(a)
@@ -355,12 +303,12 @@ def main():
         print("Hololink started successfully")
         
         # Now create sensor
+        imx258 = _ensure_sensor_module()
         sensor = imx258.Imx258(channel, args.camera_id)
         
         # CRITICAL: Configure sensor to initialize I2C communication
-        from hololink.sensors.imx258 import Imx258_Mode
         # Use a valid mode - this powers up the sensor and establishes I2C
-        sensor.configure(Imx258_Mode.IMX258_MODE_1920X1080_60FPS)
+        sensor.configure(imx258.Imx258_Mode.IMX258_MODE_1920X1080_60FPS)
         print(f"Camera {args.camera_id} configured successfully")
         
         # Optional: verify camera is responding
@@ -381,9 +329,9 @@ def main():
         try:
             hl = Hololink(args.peer_ip, args.control_port, args.serial_number, seq_check)
             channel = _resolve_channel(hl, args.camera_id)
+            imx258 = _ensure_sensor_module()
             sensor = imx258.Imx258(channel, args.camera_id)
-            from hololink.sensors.imx258 import Imx258_Mode
-            sensor.configure(Imx258_Mode.IMX258_MODE_1920X1080_60FPS)
+            sensor.configure(imx258.Imx258_Mode.IMX258_MODE_1920X1080_60FPS)
             print(f"Camera {args.camera_id} configured successfully (direct mode)")
         except Exception as e2:
             print(f"Direct connection failed: {e2}", file=sys.stderr)
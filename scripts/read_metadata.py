@@ -1,20 +1,17 @@
 import sys
 import argparse
-import json
-import datetime
 from typing import Any, Dict
-import re
 
 from hololink import Enumerator, DataChannel, Timeout
 
 
-def _clip_center(text: str, width: int) -> str:
-    if len(text) > width:
-        if width >= 3:
-            text = text[: width - 3] + "..."
-        else:
-            text = text[:width]
-    return text.center(width)
+def _maybe_clip(text: str, width: int) -> str:
+    # Only overlong cells need work; centering is left to the row format
+    if len(text) <= width:
+        return text
+    if width >= 3:
+        return text[: width - 3] + "..."
+    return text[:width]
 
 
 # Helpers to make byte-like metadata JSON-safe and readable
@@ -82,16 +79,19 @@ def print_metadata_table(title: str, metadata: Dict[str, Any], width: int = 120,
     inner_full = width - 2
     left_w = (width - 3) // 2
     right_w = (width - 3) - left_w
+    # Column widths are fixed for the whole table, so bake them into the row formats
+    single_fmt = "|{:^%d}|" % inner_full
+    row_fmt = "|{:^%d}|{:^%d}|" % (left_w, right_w)
+    # The table is built up here and written once
+    out: list[str] = []
 
     def _row_single(text: str):
-        print(sep)
-        print("|" + _clip_center(text, inner_full) + "|")
+        out.append(sep)
+        out.append(single_fmt.format(_maybe_clip(text, inner_full)))
 
     def _row_double(left: str, right: str):
-        print(sep)
-        print(
-            "|" + _clip_center(left, left_w) + "|" + _clip_center(right, right_w) + "|"
-        )
+        out.append(sep)
+        out.append(row_fmt.format(_maybe_clip(left, left_w), _maybe_clip(right, right_w)))
 
     if show_serial_header and title:
         _row_single(title)
@@ -125,14 +125,13 @@ def print_metadata_table(title: str, metadata: Dict[str, Any], width: int = 120,
 
     if not items:
         _row_double("<no metadata>", "")
-        print(sep)
-        return
-
-    it = iter(items)
-    for left in it:
-        right = next(it, "")
-        _row_double(left, right)
-    print(sep)
+    else:
+        it = iter(items)
+        for left in it:
+            right = next(it, "")
+            _row_double(left, right)
+    out.append(sep)
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 def flatten(d: Dict[str, Any], prefix: str = "", out: Dict[str, Any] | None = None) -> Dict[str, Any]:
@@ -233,6 +232,10 @@ def main() -> None:
         else:
             filtered = meta_out
         if args.json:
+            # Only needed for --json; this module is also imported for search_metadata_value()
+            import datetime
+            import json
+
             payload = {
                 "metadata": _json_safe(filtered)
             }
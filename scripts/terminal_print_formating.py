@@ -1,4 +1,8 @@
 
+import os
+import sys
+
+import numpy as np
 from PIL import Image
 
 CHARS = "█▓▒░▐█▇▆▅▄▃▂▁._ "
@@ -9,23 +13,25 @@ def print_img2char(path, width=90, gamma=0.9):
     aspect = h / w
     new_h = int(width * aspect * 0.5)  # 0.5 compensates for character aspect ratio
     img = img.resize((width, new_h))
-    #pixels = list(img.get_flattened_data())
-    pixels = list(img.getdata())
+    pixels = np.frombuffer(img.tobytes(), dtype=np.uint8).reshape(new_h, width)
 
-    lut = [CHARS[int(((i / 255.0) ** gamma) * (len(CHARS) - 1))] for i in range(256)]
+    # Gray level -> character, as UTF-32 code points so a whole row maps in one
+    # fancy-indexing step and decodes back to str without a per-pixel loop
+    gamma_lut = (((np.arange(256) / 255.0) ** gamma) * (len(CHARS) - 1)).astype(np.intp)
+    char_lut = np.frombuffer(CHARS.encode("utf-32-le"), dtype="<u4")[gamma_lut]
+    mapped = char_lut[pixels]
 
     lines = []
     print("#" * 90)
     
-    for i in range(0, len(pixels), width):
+    for r in range(new_h):
+        i = r * width
         if i == 0 or i == 540: 
             lines.append("|" + " " * 88 + "|")
         elif i ==630:
             break
         else:
-            row = pixels[i:i+width]
-            #line = "".join(CHARS[p * (len(CHARS)-1) // 255] for p in row)
-            line = "".join(lut[p] for p in row)
+            line = mapped[r].tobytes().decode("utf-32-le")
             line = "|" + line[1:-1] + "|"
             lines.append(line)
 
@@ -47,6 +53,14 @@ def header_footer(space=int, string=str) -> str:
 
     return to_print
 
+def clear_screen():
+    """Clear the terminal; ANSI escape on POSIX instead of forking a shell for `clear`."""
+    if os.name == 'nt':
+        os.system('cls')
+    else:
+        sys.stdout.write("\x1b[2J\x1b[H")
+        sys.stdout.flush()
+
 def print_end():
     print(" " * 90)
     end_top = "░█▀▀░█▀▀░█▀▄░▀█▀░█▀█░▀█▀░░░█▀▀░█▀█░█▀▄"
@@ -1,29 +1,24 @@
 import hashlib
 import argparse
-import os
 
    
 
-def measure_file(filename) -> str:
-        image, metadata, content = fetch_file(filename)
-        md5 = hashlib.md5(content).hexdigest()
+def measure_file(filename, algorithm="md5") -> str:
+        # Integrity check only, so OpenSSL can skip its FIPS approved-algorithm path
+        md5 = hashlib.new(algorithm, usedforsecurity=False)
+        buf = bytearray(1 << 20)
+        view = memoryview(buf)
+        # Stream the file through one reused buffer instead of reading it whole
+        with open(filename, "rb", buffering=0) as f:
+            while n := f.readinto(buf):
+                md5.update(view[:n])
         
-        return md5
-
-def fetch_file(filename):
-    p = os.path.split(filename)
-    image = p[-1]
-    with open(filename, "rb") as f:
-        content = f.read()
-    metadata = {
-        "filename": filename,
-    }
-    return image, metadata, content
+        return md5.hexdigest()
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--bitstream-path", required=True, type=str, help="Bitstream file path (local file path)")
-    parser.add_argument("--md5", type=str, help="Expected MD5 checksum (hex string)")
+    parser.add_argument("--md5", type=str, help="Expected MD5 or SHA-256 checksum (hex string)")
 
     return parser.parse_args()
 
@@ -31,18 +26,20 @@ def main():
 
     args = parse_args()
 
-    generated_md5 = measure_file(args.bitstream_path)
-    print(f"Generated MD5 checksum: {generated_md5}")
+    # A 64 hex digit expected value is SHA-256 (SHA-NI accelerated), otherwise MD5
+    algorithm, name = ("sha256", "SHA-256") if args.md5 is not None and len(args.md5) == 64 else ("md5", "MD5")
+    generated_md5 = measure_file(args.bitstream_path, algorithm)
+    print(f"Generated {name} checksum: {generated_md5}")
 
     if args.md5 is None:
         print("No expected MD5 provided for comparison")
         return True
     
     if args.md5 == generated_md5:
-        print("✓ MD5 checksum matches expected value.")
+        print(f"✓ {name} checksum matches expected value.")
         return True
     else:
-        print(f"✗ Generated MD5 checksum {generated_md5} does NOT match expected value {args.md5}!")
+        print(f"✗ Generated {name} checksum {generated_md5} does NOT match expected value {args.md5}!")
         return False
 
 if __name__ == "__main__":